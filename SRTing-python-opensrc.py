@@ -1,7 +1,10 @@
+import time
+
+_startup_started = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from whisper_timestamped import load_model, transcribe
 from datetime import timedelta
 from PIL import Image, ImageTk
 import webbrowser
@@ -9,6 +12,25 @@ import traceback
 import os
 import sys
 import threading
+import gc
+import glob
+import gzip
+import json
+import re
+import hashlib
+import ipaddress
+import argparse
+import itertools
+import logging
+import logging.handlers
+import urllib.parse
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
 
 if sys.stderr is None:
     import os
@@ -23,9 +45,23 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def app_cache_dir(*parts):
+    base = os.environ.get("SRTING_CACHE_DIR")
+    if not base:
+        if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+            base = os.path.join(os.environ["LOCALAPPDATA"], "SRTing", "cache")
+        else:
+            base = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser(os.path.join("~", ".cache"))),
+                                "srting")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
 class AppState:
     def __init__(self):
         self.show_ffmpeg_error = False
+        self.startup_ready = threading.Event()
 
 
 app_state = AppState()
@@ -55,36 +91,69 @@ def setup_whisper_assets():
     if not os.path.exists(tiktoken_file):
         print(f"WARNING: Critical file missing: {tiktoken_file}")
 
-        for root, dirs, files in os.walk(
-                os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.getcwd()):
-            if "multilingual.tiktoken" in files:
-                found_path = os.path.join(root, "multilingual.tiktoken")
-                print(f"Found tiktoken file at: {found_path}")
+        found_path = find_tiktoken_file(
+            os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.getcwd())
+        if found_path:
+            print(f"Found tiktoken file at: {found_path}")
 
-                import shutil
-                os.makedirs(os.path.dirname(tiktoken_file), exist_ok=True)
-                shutil.copy(found_path, tiktoken_file)
-                print(f"Copied tiktoken file to: {tiktoken_file}")
-                break
+            import shutil
+            os.makedirs(os.path.dirname(tiktoken_file), exist_ok=True)
+            shutil.copy(found_path, tiktoken_file)
+            print(f"Copied tiktoken file to: {tiktoken_file}")
 
 
-setup_whisper_assets()
+def find_tiktoken_file(search_root):
+    """Walk search_root for multilingual.tiktoken, remembering the answer so later launches skip the walk"""
+    search_root = os.path.abspath(search_root)
+    cache_file = os.path.join(app_cache_dir(), "asset_search.json")
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f).get(search_root)
+    except Exception:
+        cached = None
 
-ffmpeg_exe = resource_path(os.path.join("assets", "ffmpeg.exe"))
-if os.path.exists(ffmpeg_exe):
-    os.environ["PATH"] = os.path.dirname(ffmpeg_exe) + os.pathsep + os.environ.get("PATH", "")
-    print(f"Using ffmpeg from: {ffmpeg_exe}")
-else:
-    import subprocess
+    if cached:
+        if cached.get("found") and os.path.exists(cached["found"]):
+            return cached["found"]
+        # Nothing was found last time, only search again if the folder itself changed
+        if not cached.get("found") and cached.get("mtime") == os.stat(search_root).st_mtime:
+            return None
+
+    found_path = None
+    for root, dirs, files in os.walk(search_root):
+        if "multilingual.tiktoken" in files:
+            found_path = os.path.join(root, "multilingual.tiktoken")
+            break
 
     try:
-        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        print("Found ffmpeg in PATH")
-    except:
-        print(f"ffmpeg not found at: {ffmpeg_exe} or in PATH")
-        app_state.show_ffmpeg_error = True
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                results = json.load(f)
+        except Exception:
+            results = {}
+        results[search_root] = {"found": found_path, "mtime": os.stat(search_root).st_mtime}
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+    except Exception as e:
+        print(f"Error saving asset search result: {str(e)}")
+    return found_path
 
 
+def setup_ffmpeg():
+    ffmpeg_exe = resource_path(os.path.join("assets", "ffmpeg.exe"))
+    if os.path.exists(ffmpeg_exe):
+        os.environ["PATH"] = os.path.dirname(ffmpeg_exe) + os.pathsep + os.environ.get("PATH", "")
+        print(f"Using ffmpeg from: {ffmpeg_exe}")
+    else:
+        import subprocess
+
+        try:
+            subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            print("Found ffmpeg in PATH")
+        except:
+            print(f"ffmpeg not found at: {ffmpeg_exe} or in PATH")
+            app_state.show_ffmpeg_error = True
+
 def debug_pyinstaller_environment():
     """Helper function to debug PyInstaller environment"""
     try:
@@ -143,7 +212,14 @@ def debug_pyinstaller_environment():
             traceback.print_exc(file=f)
 
 
-debug_pyinstaller_environment()
+def run_startup_checks():
+    """Asset setup and ffmpeg probe; model loading waits for this to finish"""
+    try:
+        setup_whisper_assets()
+        setup_ffmpeg()
+    finally:
+        app_state.startup_ready.set()
+
 
 SUPPORTED_FORMATS = [".mp3", ".mp4", ".avi", ".wav", ".mov"]
 
@@ -168,9 +244,15 @@ MODEL_OPTIONS = {
     "tiny - very fast, low quality": "tiny",
     "base - fast, medium quality": "base",
     "small - slower, good quality": "small",
-    "medium - slowest, very good quality": "medium"
+    "medium - slowest, very good quality": "medium",
+    "base - CPU optimized (int8)": "base-int8",
+    "small - CPU optimized (int8)": "small-int8",
+    "medium - CPU optimized (int8)": "medium-int8"
 }
 
+# Models with this suffix get their linear layers quantized to int8 after loading, for faster CPU-only inference
+QUANTIZED_SUFFIX = "-int8"
+
 UI_LANGUAGES = {
     "Polski": {
         "title": "SRTify",
@@ -184,7 +266,29 @@ UI_LANGUAGES = {
         "error_choose": "Wybierz plik, język i model.",
         "done": "Gotowe",
         "saved_as": "Napisy zapisane jako:",
-        "error_log": "Coś poszło nie tak. Sprawdź error_log.txt"
+        "error_log": "Coś poszło nie tak. Sprawdź error_log.txt",
+        "long_file": "Tryb długich plików (równoległe fragmenty)",
+        "queue": "Kolejka zadań:",
+        "queue_file": "Plik",
+        "queue_model": "Model",
+        "queue_status": "Status",
+        "cancel": "Anuluj zaznaczone",
+        "parallel_jobs": "Równoległe zadania:",
+        "all_done": "Zapisano napisy dla {count} plików.",
+        "pending": "Oczekuje",
+        "running": "W trakcie",
+        "failed": "Błąd",
+        "cancelled": "Anulowano",
+        "slowest": "Najwolniejszy plik:",
+        "total": "Razem",
+        "audio": "Nagranie",
+        "peak_memory": "Szczytowe zużycie pamięci",
+        "queue_progress": "Postęp",
+        "eta": "pozostało",
+        "latest_cues": "Ostatnie napisy:",
+        "max_chars": "Maks. znaków:",
+        "max_duration": "Maks. sekund:",
+        "split_gap": "Podział na pauzie (s):"
     },
     "English": {
         "title": "SRTify",
@@ -198,121 +302,2945 @@ UI_LANGUAGES = {
         "error_choose": "Select file, language and model.",
         "done": "Done",
         "saved_as": "Subtitles saved as:",
-        "error_log": "Something went wrong. Check error_log.txt"
+        "error_log": "Something went wrong. Check error_log.txt",
+        "long_file": "Long file mode (parallel chunks)",
+        "queue": "Job queue:",
+        "queue_file": "File",
+        "queue_model": "Model",
+        "queue_status": "Status",
+        "cancel": "Cancel selected",
+        "parallel_jobs": "Parallel jobs:",
+        "all_done": "Subtitles saved for {count} files.",
+        "pending": "Pending",
+        "running": "Running",
+        "failed": "Failed",
+        "cancelled": "Cancelled",
+        "slowest": "Slowest file:",
+        "total": "Total",
+        "audio": "Audio",
+        "peak_memory": "Peak memory",
+        "queue_progress": "Progress",
+        "eta": "ETA",
+        "latest_cues": "Latest subtitles:",
+        "max_chars": "Max chars:",
+        "max_duration": "Max seconds:",
+        "split_gap": "Split at pause (s):"
     }
 }
 
 current_ui_lang = UI_LANGUAGES["English"]
 
-try:
-    root = tk.Tk()
 
-    if app_state.show_ffmpeg_error:
-        messagebox.showerror("FFmpeg Missing",
-                             "ffmpeg was not found. This application requires ffmpeg to work properly.")
+MODEL_CACHE_BUDGET_MB = int(os.environ.get("SRTING_MODEL_CACHE_MB", "4096"))
+
+
+def estimate_model_size(model):
+    """Approximate memory taken by a loaded model, in bytes"""
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        # Dynamically quantized layers keep their int8 weights outside of parameters()
+        tensors += [module.weight() for module in model.modules()
+                    if hasattr(module, "_packed_params") and callable(getattr(module, "weight", None))]
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception as e:
+        print(f"Error estimating model size: {str(e)}")
+        return 0
+
+
+TORCH_INTRA_OP_THREADS = int(os.environ.get("SRTING_INTRA_OP_THREADS", "0"))
+TORCH_INTER_OP_THREADS = int(os.environ.get("SRTING_INTER_OP_THREADS", "0"))
+
+_torch_threads_configured = False
+
+
+def configure_torch_threads(intra_op=None, inter_op=None):
+    """Apply the thread counts once, before the first model runs; 0 keeps torch's default"""
+    global _torch_threads_configured
+    if _torch_threads_configured:
+        return
+    _torch_threads_configured = True
+    import torch
+
+    intra_op = intra_op or TORCH_INTRA_OP_THREADS
+    inter_op = inter_op or TORCH_INTER_OP_THREADS
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            # Only possible before torch has started any parallel work
+            print(f"Error setting inter-op threads: {str(e)}")
+    print(f"Torch threads: {torch.get_num_threads()} intra-op, {torch.get_num_interop_threads()} inter-op")
+
+
+def quantize_model(model):
+    """int8 dynamic quantization of all linear layers, in place; only runs on the CPU"""
+    import torch
+    from whisper.model import Linear
+
+    # quantize_dynamic only replaces modules whose type is exactly nn.Linear, so drop whisper's dtype-casting subclass
+    for module in model.modules():
+        if isinstance(module, Linear):
+            module.__class__ = torch.nn.Linear
+    torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+FAST_MODELS_ENABLED = os.environ.get("SRTING_FAST_MODELS", "1") == "1"
+FAST_MODEL_CACHE_MAX_MB = int(os.environ.get("SRTING_FAST_MODEL_CACHE_MB", "8192"))
+
+_conversions = {}
+_conversions_lock = threading.Lock()
+
+
+def fast_model_path(model_name):
+    return os.path.join(app_cache_dir("models"), f"{model_name}.pt")
+
+
+def fast_model_checkpoint(model_name, model):
+    """What convert_fast_model saves; on the CPU the tensors are the model's own, so this copies nothing"""
+    import torch
+    import whisper
+
+    state = {name: tensor.detach().to("cpu", torch.float32) for name, tensor in model.state_dict().items()}
+    return {"source": whisper._MODELS.get(model_name), "dims": dict(vars(model.dims)), "model_state_dict": state}
+
+
+def convert_fast_model(model_name, model=None, checkpoint=None):
+    """Save a model's weights as plain float32 tensors that load_fast_model can map straight from disk"""
+    import torch
+    import whisper
+
+    if checkpoint is None:
+        if model is None:
+            model = whisper.load_model(model_name, device="cpu")
+        checkpoint = fast_model_checkpoint(model_name, model)
+    path = fast_model_path(model_name)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        torch.save(checkpoint, temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    # Every converted model is a full precision copy, a few GB for the large ones
+    evict_cache_dir(os.path.dirname(path), FAST_MODEL_CACHE_MAX_MB * 1024 * 1024, keep=path)
+    print(f"Converted model {model_name} for fast loading: {path}")
+    return path
+
+
+def convert_fast_model_in_background(model_name, model):
+    """Convert a just loaded model on a thread, so the job that loaded it doesn't wait for the write"""
+    def convert():
+        try:
+            convert_fast_model(model_name, checkpoint=checkpoint)
+        except Exception as e:
+            print(f"Error converting model {model_name} for fast loading: {str(e)}")
+        finally:
+            with _conversions_lock:
+                _conversions.pop(model_name, None)
+
+    with _conversions_lock:
+        if model_name in _conversions:
+            return
+        # Taken now: quantization changes the model in place right after loading
+        checkpoint = fast_model_checkpoint(model_name, model)
+        # Not a daemon, so a headless run that ends right away still finishes the file
+        thread = threading.Thread(target=convert, name=f"convert-{model_name}")
+        _conversions[model_name] = thread
+    thread.start()
+
+
+def wait_for_conversions():
+    with _conversions_lock:
+        threads = list(_conversions.values())
+    for thread in threads:
+        thread.join()
+
+
+@contextmanager
+def skipped_weight_init():
+    """Build layers without filling them with random weights, for weights that are replaced right away"""
+    import torch
+
+    classes = (torch.nn.Linear, torch.nn.modules.conv._ConvNd, torch.nn.Embedding, torch.nn.LayerNorm)
+    originals = [cls.reset_parameters for cls in classes]
+    for cls in classes:
+        cls.reset_parameters = lambda self: None
+    try:
+        yield
+    finally:
+        for cls, original in zip(classes, originals):
+            cls.reset_parameters = original
+
+
+def load_fast_model(model_name, device="cpu"):
+    """Model whose weights are memory-mapped from its converted file, None when there is no usable conversion;
+    processes mapping the same file share its pages through the OS cache"""
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    path = fast_model_path(model_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        if checkpoint.get("source") != whisper._MODELS.get(model_name):
+            print(f"Fast model {model_name} was converted from another checkpoint, converting again")
+            return None
+        # Recently used conversions are the last to be evicted
+        os.utime(path)
+        # The layers' own untouched allocations are swapped for the mapped tensors, so no weights are ever copied.
+        # The meta device would avoid even those, but its ops import torch's compiler stack, which costs seconds
+        with skipped_weight_init():
+            model = Whisper(ModelDimensions(**checkpoint["dims"]))
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+        return model.to(device)
+    except Exception as e:
+        print(f"Error loading fast model {model_name}: {str(e)}")
+        return None
+
+
+def load_whisper_model(model_type):
+    app_state.startup_ready.wait()
+    configure_torch_threads()
+    import torch
+    from whisper_timestamped import load_model
+    from whisper.model import MultiHeadAttention
+    # whisper_timestamped switches SDPA off and back on globally around every transcription,
+    # which breaks other transcriptions running at the same time, so keep it off for good
+    MultiHeadAttention.use_sdpa = False
+    quantized = model_type.endswith(QUANTIZED_SUFFIX)
+    model_name = model_type[:-len(QUANTIZED_SUFFIX)] if quantized else model_type
+    device = "cuda" if torch.cuda.is_available() and not quantized else "cpu"
+    model = load_fast_model(model_name, device) if FAST_MODELS_ENABLED else None
+    if model is None:
+        model = load_model(model_name, device=device)
+        if FAST_MODELS_ENABLED:
+            try:
+                convert_fast_model_in_background(model_name, model)
+            except Exception as e:
+                print(f"Error converting model {model_name} for fast loading: {str(e)}")
+    return quantize_model(model) if quantized else model
 
-    icon_path = resource_path(os.path.join("assets", "sygnetlogostrlogo1.png"))
-    if os.path.exists(icon_path):
+
+def run_convert_models(args):
+    """Convert models ahead of time, e.g. right after installing, instead of on their first use"""
+    run_startup_checks()
+    failed = 0
+    for model_name in args.convert_models:
+        started = time.perf_counter()
         try:
-            icon_image = Image.open(icon_path)
-            icon_photo = ImageTk.PhotoImage(icon_image)
-            root.iconphoto(False, icon_photo)
+            path = convert_fast_model(model_name)
+            print(f"OK   {model_name} -> {path} ({os.path.getsize(path) / 1024 / 1024:.0f} MB, "
+                  f"{time.perf_counter() - started:.1f}s)")
         except Exception as e:
-            print(f"Error setting application icon: {str(e)}")
-    root.title(current_ui_lang["title"])
-    root.geometry("560x620")
-    root.configure(bg="#121212")
-except Exception as e:
-    print(f"Error initializing Tkinter: {str(e)}")
-    with open("tkinter_error.txt", "w") as f:
-        f.write(f"Error initializing Tkinter: {str(e)}\n")
-        traceback.print_exc(file=f)
-    sys.exit(1)
-
-selected_file = tk.StringVar()
-output_folder = tk.StringVar()
-words_per_line = tk.IntVar(value=1)
-
-try:
-    style = ttk.Style()
-    style.theme_use("clam")
-    style.configure("TFrame", background="#121212")
-    style.configure("TLabel", background="#121212", foreground="#D1C4E9", font=("Segoe UI", 11))
-    style.configure("TButton", font=("Segoe UI", 11, "bold"), padding=6)
-    style.configure("TCombobox", fieldbackground="#2c2c38", background="#2c2c38", foreground="white",
-                    font=("Segoe UI", 11))
-    style.map("TCombobox", fieldbackground=[("readonly", "#2c2c38")], foreground=[("readonly", "white")])
-
-    frame = ttk.Frame(root, padding=20)
-    frame.pack(fill="both", expand=True)
-except Exception as e:
-    print(f"Error setting up Tkinter style: {str(e)}")
-    messagebox.showerror("Error", f"Error setting up UI: {str(e)}")
-
-try:
-    logo_path = resource_path(os.path.join("assets", "logosrtify1.png"))
-    if os.path.exists(logo_path):
-        logo_image = Image.open(logo_path).resize((180, 45), Image.LANCZOS)
-        logo_photo = ImageTk.PhotoImage(logo_image)
-        logo_label = tk.Label(frame, image=logo_photo, bg="#121212")
-        logo_label.image = logo_photo
-        logo_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
+            failed += 1
+            print(f"FAIL {model_name}: {str(e)}")
+    return 1 if failed else 0
+
+
+class WhisperBackend:
+    """Loads and runs the Whisper models; the benchmark swaps in StubBackend to measure everything around them"""
+
+    def load(self, model_type):
+        return load_whisper_model(model_type)
+
+    def model_size(self, model):
+        return estimate_model_size(model)
+
+    def transcribe(self, model, audio, lang, initial_prompt=None):
+        from whisper_timestamped import transcribe
+        return transcribe(model, as_audio_tensor(audio), language=lang, initial_prompt=initial_prompt)
+
+    def transcribe_batch(self, model, clips, lang):
+        import torch
+        from whisper.audio import HOP_LENGTH, N_FRAMES, log_mel_spectrogram, pad_or_trim
+        from whisper.decoding import DecodingOptions, decode
+        from whisper.timing import add_word_timestamps
+        from whisper.tokenizer import get_tokenizer
+
+        results = [None] * len(clips)
+        speech_maps = {}
+        batch, mels, frames = [], [], []
+        for index, audio in enumerate(clips):
+            if len(audio) > CLIP_MAX_SECONDS * SAMPLE_RATE:
+                results[index] = (transcribe_windows(model, audio, lang), lang)
+                continue
+            if VAD_ENABLED:
+                regions = detect_speech(audio)
+                if not regions:
+                    results[index] = ([], lang)
+                    continue
+                speech_maps[index] = SpeechMap(regions)
+                audio = speech_maps[index].compact(audio)
+            batch.append(index)
+            mels.append(pad_or_trim(log_mel_spectrogram(as_audio_tensor(audio), model.dims.n_mels), N_FRAMES))
+            frames.append(min(len(audio) // HOP_LENGTH, N_FRAMES))
+        if not batch:
+            return results
+
+        # English-only models have no language tokens to detect with
+        options = DecodingOptions(language=lang or (None if model.is_multilingual else "en"), without_timestamps=True,
+                                  fp16=False)
+        mel = torch.stack(mels).to(model.device)
+        with torch.no_grad():
+            decoded = decode(model, mel, options)
+        for index, clip_mel, num_frames, result in zip(batch, mel, frames, decoded):
+            if result.no_speech_prob > CLIP_NO_SPEECH_LIMIT and result.avg_logprob < CLIP_LOGPROB_LIMIT:
+                results[index] = ([], result.language)
+                continue
+            if result.compression_ratio > CLIP_COMPRESSION_RATIO_LIMIT or result.avg_logprob < CLIP_LOGPROB_LIMIT:
+                results[index] = transcribe_span(model, clips[index], lang)
+                continue
+            tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                      language=result.language, task="transcribe")
+            segment = {"seek": 0, "start": 0.0, "end": num_frames * HOP_LENGTH / SAMPLE_RATE, "text": result.text,
+                       "tokens": [token for token in result.tokens if token < tokenizer.eot]}
+            # Timestamps need the cross-attention of each clip on its own, which is one forward pass without sampling
+            add_word_timestamps(segments=[segment], model=model, tokenizer=tokenizer, mel=clip_mel,
+                                num_frames=num_frames, last_speech_timestamp=0.0)
+            timed = {"segments": [{"words": [{"text": word["word"].strip(), "start": float(word["start"]),
+                                              "end": float(word["end"]), "confidence": float(word["probability"])}
+                                             for word in segment.get("words", [])]}]}
+            limit = len(clips[index]) / SAMPLE_RATE
+            if index in speech_maps:
+                words = speech_maps[index].map_words(result_words(timed), 0.0, limit)
+            else:
+                words = result_words(timed, 0.0, limit)
+            results[index] = (words, result.language)
+        return results
+
+    def detect_language(self, model, audio):
+        """Language probabilities for the first 30 seconds of audio"""
+        import numpy as np
+        import torch
+        from whisper.audio import log_mel_spectrogram, pad_or_trim
+
+        mel = log_mel_spectrogram(pad_or_trim(np.asarray(audio, dtype=np.float32)), model.dims.n_mels)
+        with torch.no_grad():
+            _, probs = model.detect_language(mel.to(model.device))
+        return probs
+
+    @contextmanager
+    def cancellable(self, model, cancel_event):
+        if cancel_event is None:
+            yield
+            return
+
+        def stop_if_cancelled(module, inputs):
+            check_cancelled(cancel_event)
+
+        hook = model.encoder.register_forward_pre_hook(stop_if_cancelled)
+        try:
+            yield
+        finally:
+            hook.remove()
+
+
+class ModelRegistry:
+    """Keeps loaded Whisper models in memory between jobs, evicting the least recently used"""
+
+    def __init__(self, budget_bytes, backend=None):
+        self.budget_bytes = budget_bytes
+        self.backend = backend or WhisperBackend()
+        self._models = OrderedDict()
+        self._loading = {}
+        self._run_locks = {}
+        self._in_use = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_type):
+        while True:
+            with self._lock:
+                if model_type in self._models:
+                    self._models.move_to_end(model_type)
+                    return self._models[model_type][0]
+                loaded = self._loading.get(model_type)
+                if loaded is None:
+                    loaded = self._loading[model_type] = threading.Event()
+                    break
+            # Somebody else is already loading this model, wait for it instead of loading a second copy
+            loaded.wait()
+
+        try:
+            print(f"Loading model: {model_type}")
+            model = self.backend.load(model_type)
+            size = self.backend.model_size(model)
+            print(f"Model {model_type} loaded ({size / 1024 / 1024:.0f} MB)")
+            with self._lock:
+                self._models[model_type] = (model, size)
+                self._evict_locked(keep=model_type)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(model_type, None)
+            loaded.set()
+
+    @contextmanager
+    def use(self, model_type):
+        """Borrow a model for one transcription; models in use are never evicted"""
+        with self._lock:
+            self._in_use[model_type] = self._in_use.get(model_type, 0) + 1
+            run_lock = self._run_locks.setdefault(model_type, threading.Lock())
+        try:
+            model = self.get(model_type)
+            # whisper_timestamped hooks into the model while transcribing, so one job per model at a time
+            with run_lock:
+                yield model
+        finally:
+            with self._lock:
+                self._in_use[model_type] -= 1
+                if not self._in_use[model_type]:
+                    del self._in_use[model_type]
+                self._evict_locked()
+
+    def clear(self):
+        """Drop every cached model that is not in use"""
+        with self._lock:
+            for model_type in [name for name in self._models if name not in self._in_use]:
+                del self._models[model_type]
+        gc.collect()
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._models)
+
+    def is_loaded(self, model_type):
+        with self._lock:
+            return model_type in self._models
+
+    def preload(self, model_type):
+        """Start loading a model in the background so it is ready when the job starts"""
+        with self._lock:
+            if model_type in self._models or model_type in self._loading:
+                return
+
+        def task():
+            try:
+                self.get(model_type)
+            except Exception as e:
+                print(f"Error preloading model {model_type}: {str(e)}")
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def _evict_locked(self, keep=None):
+        total = sum(size for _, size in self._models.values())
+        evicted = False
+        for model_type in list(self._models):
+            if total <= self.budget_bytes:
+                break
+            if model_type == keep or model_type in self._in_use:
+                continue
+            _, size = self._models.pop(model_type)
+            total -= size
+            evicted = True
+            print(f"Evicted model {model_type} from cache ({size / 1024 / 1024:.0f} MB)")
+        if evicted:
+            gc.collect()
+
+
+model_registry = ModelRegistry(MODEL_CACHE_BUDGET_MB * 1024 * 1024)
+
+
+SAMPLE_RATE = 16000
+LONG_FILE_CHUNK_SECONDS = 300
+LONG_FILE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def result_words(result, offset=0.0, limit=None):
+    """Flatten timed words out of a transcribe() result, shifted by offset seconds and clipped at limit"""
+    words = []
+    for segment in result["segments"]:
+        for word in segment["words"]:
+            if word.get("start") is None or word.get("end") is None:
+                continue
+            word = dict(word, start=word["start"] + offset, end=word["end"] + offset)
+            if limit is not None:
+                if word["start"] >= limit:
+                    continue
+                word["end"] = min(word["end"], limit)
+            words.append(word)
+    return words
+
+
+class WordTable:
+    """Timed words as NumPy columns plus one text buffer in which every word is followed by a single space"""
+
+    def __init__(self, text, offsets, start, end, confidence):
+        self.text = text
+        # Word i is text[offsets[i]:offsets[i + 1] - 1], so a run of words is one slice of the buffer
+        self.offsets = offsets
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+
+    @classmethod
+    def from_words(cls, words):
+        import numpy as np
+
+        if isinstance(words, cls):
+            return words
+        count = len(words)
+        texts = [word["text"].strip() for word in words]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=count) + 1, out=offsets[1:])
+        return cls(" ".join(texts) + " " if texts else "", offsets,
+                   np.fromiter((word["start"] for word in words), dtype=np.float64, count=count),
+                   np.fromiter((word["end"] for word in words), dtype=np.float64, count=count),
+                   np.fromiter((word.get("confidence", np.nan) for word in words), dtype=np.float32, count=count))
+
+    @classmethod
+    def concat(cls, tables):
+        import numpy as np
+
+        tables = [table for table in tables if len(table)] or [cls.from_words([])]
+        if len(tables) == 1:
+            return tables[0]
+        shifts = np.cumsum([0] + [len(table.text) for table in tables[:-1]])
+        offsets = np.concatenate([tables[0].offsets[:1]] + [table.offsets[1:] + shift
+                                                            for table, shift in zip(tables, shifts)])
+        return cls("".join(table.text for table in tables), offsets,
+                   np.concatenate([table.start for table in tables]), np.concatenate([table.end for table in tables]),
+                   np.concatenate([table.confidence for table in tables]))
+
+    def __len__(self):
+        return len(self.start)
+
+    def slice(self, lo, hi):
+        base = self.offsets[lo]
+        return WordTable(self.text[base:self.offsets[hi]], self.offsets[lo:hi + 1] - base, self.start[lo:hi],
+                         self.end[lo:hi], self.confidence[lo:hi])
+
+    def to_words(self):
+        import numpy as np
+
+        offsets = self.offsets.tolist()
+        words = []
+        for index, (start, end, confidence) in enumerate(zip(self.start.tolist(), self.end.tolist(),
+                                                             self.confidence.tolist())):
+            word = {"text": self.text[offsets[index]:offsets[index + 1] - 1], "start": start, "end": end}
+            if not np.isnan(confidence):
+                word["confidence"] = confidence
+            words.append(word)
+        return words
+
+
+class GroupingRules:
+    """Limits for one subtitle cue; limits left at None don't apply, a cue always holds at least one word"""
+
+    def __init__(self, max_words=1, max_chars=None, max_duration=None, split_gap=None):
+        self.max_words = max_words
+        self.max_chars = max_chars
+        self.max_duration = max_duration
+        self.split_gap = split_gap
+
+    @classmethod
+    def of(cls, group_size):
+        """Rules as given, or a plain words-per-line number as used by the GUI spinbox and -w"""
+        return group_size if isinstance(group_size, cls) else cls(max_words=max(1, int(group_size)))
+
+    def as_dict(self):
+        return {"words_per_line": self.max_words, "max_chars": self.max_chars, "max_duration": self.max_duration,
+                "split_gap": self.split_gap}
+
+
+def group_bounds(table, group_size):
+    """Indices where the cues of table start, followed by len(table)"""
+    import numpy as np
+
+    rules = GroupingRules.of(group_size)
+    count = len(table)
+    index = np.arange(count)
+    if rules.max_chars is None and rules.max_duration is None and rules.split_gap is None:
+        return np.append(index[::rules.max_words or count or 1], count)
+
+    # Where the cue starting at each word has to end at the latest, one limit at a time over all words at once
+    limit = np.full(count, count, dtype=np.int64)
+    if rules.split_gap is not None:
+        breaks = np.append(np.flatnonzero(table.start[1:] - table.end[:-1] >= rules.split_gap) + 1, count)
+        limit = np.minimum(limit, breaks[np.searchsorted(breaks, index, side="right")])
+    if rules.max_words:
+        limit = np.minimum(limit, index + rules.max_words)
+    if rules.max_chars is not None:
+        limit = np.minimum(limit, np.searchsorted(table.offsets, table.offsets[:-1] + rules.max_chars + 1,
+                                                  side="right") - 1)
+    if rules.max_duration is not None:
+        latest_end = np.maximum.accumulate(table.end)
+        limit = np.minimum(limit, np.searchsorted(latest_end, table.start + rules.max_duration, side="right"))
+    next_start = np.maximum(limit, index + 1).tolist()
+
+    bounds = [0]
+    while bounds[-1] < count:
+        bounds.append(next_start[bounds[-1]])
+    return np.asarray(bounds, dtype=np.int64)
+
+
+def format_timestamps(seconds):
+    """SRT timestamps (HH:MM:SS,mmm) for a whole array of times in one pass"""
+    import numpy as np
+
+    seconds = np.maximum(np.asarray(seconds, dtype=np.float64), 0.0)
+    whole = np.floor(seconds)
+    millis = ((seconds - whole) * 1000).astype(np.int64)
+    hours, rest = np.divmod(whole.astype(np.int64), 3600)
+    minutes, secs = np.divmod(rest, 60)
+    return [f"{h:02}:{m:02}:{s:02},{ms:03d}"
+            for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), millis.tolist())]
+
+
+def srt_cues(table, bounds, first_index=1):
+    """SRT text of every cue table[bounds[i]:bounds[i + 1]]"""
+    if len(bounds) < 2:
+        return []
+    starts = format_timestamps(table.start[bounds[:-1]])
+    ends = format_timestamps(table.end[bounds[1:] - 1])
+    offsets = table.offsets[bounds].tolist()
+    text = table.text
+    return [f"{index}\n{start} --> {end}\n{text[lo:hi - 1]}\n\n"
+            for index, start, end, lo, hi in zip(itertools.count(first_index), starts, ends, offsets, offsets[1:])]
+
+
+def partial_srt_path(output_srt):
+    """Where an SRT is written until it is complete; it keeps the .srt extension so editors can open it meanwhile"""
+    return os.path.splitext(output_srt)[0] + ".partial.srt"
+
+
+def write_srt(words, output_srt, group_size):
+    table = WordTable.from_words(words)
+    cues = srt_cues(table, group_bounds(table, group_size))
+    print(f"Writing SRT to: {output_srt}")
+    temp_path = partial_srt_path(output_srt)
+    with open(temp_path, "w", encoding="utf-8") as srt_file:
+        srt_file.writelines(cues)
+    os.replace(temp_path, output_srt)
+    return len(cues)
+
+
+class StreamingSrtWriter:
+    """Appends cues to an SRT file as soon as their words are known; only the unfinished cue stays in memory.
+    Cues go to partial_srt_path(output_srt), which only becomes output_srt once the transcription has finished"""
+
+    def __init__(self, output_srt, group_size, keep_latest=5, telemetry=None):
+        self.output_srt = output_srt
+        self.partial_srt = partial_srt_path(output_srt)
+        self.rules = GroupingRules.of(group_size)
+        self.telemetry = telemetry or JobTelemetry()
+        self.count = 0
+        self.latest_cues = deque(maxlen=keep_latest)
+        self._pending = WordTable.from_words([])
+        print(f"Writing SRT to: {self.partial_srt}")
+        self._file = open(self.partial_srt, "w", encoding="utf-8")
+
+    def add(self, words):
+        with self.telemetry.stage("grouping"):
+            table = WordTable.concat([self._pending, WordTable.from_words(words)])
+            bounds = group_bounds(table, self.rules)
+        with self.telemetry.stage("srt_write"):
+            # The last cue could still take words from the next batch, so it waits for it
+            self._write_cues(table, bounds[:-1])
+            self._pending = table.slice(int(bounds[-2]), len(table)) if len(bounds) > 1 else table
+            # Flush per batch so the cues written so far can already be opened in an editor
+            self._file.flush()
+
+    def _write_cues(self, table, bounds):
+        cues = srt_cues(table, bounds, self.count + 1)
+        self._file.writelines(cues)
+        self.latest_cues.extend(cues)
+        self.count += len(cues)
+
+    def close(self):
+        if self._file.closed:
+            return
+        with self.telemetry.stage("srt_write"):
+            self._write_cues(self._pending, group_bounds(self._pending, self.rules))
+            self._pending = WordTable.from_words([])
+            self._file.close()
+            os.replace(self.partial_srt, self.output_srt)
+        print(f"SRT file complete: {self.output_srt}")
+
+    def abort(self):
+        """Close without completing: the cues written so far stay in the partial file and output_srt is not
+        touched, so --skip-existing doesn't take a cut-off SRT for a finished one"""
+        if not self._file.closed:
+            self._file.close()
+            print(f"Incomplete SRT left at: {self.partial_srt}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+PCM_CACHE_MAX_MB = int(os.environ.get("SRTING_PCM_CACHE_MB", "4096"))
+
+
+def pcm_cache_path(video_path):
+    stat = os.stat(video_path)
+    key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return os.path.join(app_cache_dir("pcm"), hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".f32")
+
+
+def decode_audio(video_path):
+    """Decode any supported media file to 16 kHz mono float32 samples, memory-mapped from the PCM cache"""
+    import numpy as np
+    import subprocess
+
+    cache_path = pcm_cache_path(video_path)
+    if os.path.exists(cache_path):
+        os.utime(cache_path)
+    else:
+        print(f"Decoding audio of: {video_path}")
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", video_path, "-vn", "-f", "f32le", "-ac", "1",
+               "-acodec", "pcm_f32le", "-ar", str(SAMPLE_RATE), "-y", temp_path]
+        try:
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        except subprocess.CalledProcessError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace').strip()}") from e
+        os.replace(temp_path, cache_path)
+        evict_cache_dir(os.path.dirname(cache_path), PCM_CACHE_MAX_MB * 1024 * 1024, keep=cache_path)
+
+    if os.path.getsize(cache_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    # Copy-on-write mapping: pages are shared through the OS cache and the file itself is never modified
+    return np.memmap(cache_path, dtype=np.float32, mode="c")
+
+
+STREAM_OVERLAP_SECONDS = 4
+# Longer inputs without decoded audio in the cache are read straight from ffmpeg instead of being decoded up front
+STREAM_DECODE_MIN_HOURS = float(os.environ.get("SRTING_STREAM_DECODE_HOURS", "2"))
+
+
+def probe_duration(video_path):
+    """Duration in seconds from ffmpeg's description of the input, None if it doesn't say"""
+    import subprocess
+
+    try:
+        completed = subprocess.run(["ffmpeg", "-nostdin", "-hide_banner", "-i", video_path],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=60)
+        match = re.search(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", completed.stderr)
+        if match:
+            return int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+    except Exception as e:
+        print(f"Error probing duration: {str(e)}")
+    return None
+
+
+def stream_audio(video_path, window_seconds, overlap_seconds):
+    """Yield (offset, samples) windows of 16 kHz mono float32 from an ffmpeg pipe, each one starting overlap_seconds
+    before the end of the previous one; a single buffer is reused, so a window is only valid until the next one"""
+    import numpy as np
+    import subprocess
+
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    buffer = np.empty(window, dtype=np.float32)
+    view = memoryview(buffer).cast("B")
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0", "-i", video_path, "-vn", "-f", "f32le",
+           "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(SAMPLE_RATE), "pipe:1"]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        offset = 0
+        kept = 0
+        while True:
+            filled = kept * buffer.itemsize
+            while filled < len(view):
+                count = process.stdout.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+            samples = filled // buffer.itemsize
+            if samples <= kept:
+                break
+            yield offset, buffer[:samples]
+            if samples < window:
+                break
+            buffer[:overlap] = buffer[window - overlap:]
+            offset += window - overlap
+            kept = overlap
+        finished = True
+    finally:
+        if not finished and process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.wait()
+    if process.returncode:
+        raise RuntimeError(f"Failed to decode audio: {stderr.decode(errors='replace').strip()}")
+
+
+def run_whisper(model, audio, lang, initial_prompt=None):
+    """One transcribe() call on decoded samples"""
+    return model_registry.backend.transcribe(model, audio, lang, initial_prompt)
+
+
+VAD_ENABLED = os.environ.get("SRTING_VAD", "0") == "1"
+VAD_MARGIN_DB = float(os.environ.get("SRTING_VAD_MARGIN_DB", "12"))
+VAD_ZCR_THRESHOLD = float(os.environ.get("SRTING_VAD_ZCR", "0.25"))
+VAD_PADDING_SECONDS = float(os.environ.get("SRTING_VAD_PADDING", "0.3"))
+VAD_FRAME_SECONDS = 0.03
+VAD_MIN_SPEECH_SECONDS = 0.25
+VAD_MIN_SILENCE_SECONDS = 0.5
+# A window that is speech from end to end must not raise the noise floor above this
+VAD_MAX_FLOOR_DB = -40.0
+
+
+def merge_runs(starts, ends, min_gap):
+    """Join runs separated by less than min_gap"""
+    import numpy as np
+
+    if not len(starts):
+        return starts, ends
+    keep = starts[1:] - ends[:-1] >= min_gap
+    return starts[np.r_[True, keep]], ends[np.r_[keep, True]]
+
+
+def detect_speech(audio, margin_db=None, zcr_threshold=None, padding_seconds=None):
+    """Sample ranges that sound like speech: frames well above the noise floor, or somewhat above it and hissing
+    like a fricative, with short pauses bridged, blips dropped and padding on both sides"""
+    import numpy as np
+
+    margin_db = VAD_MARGIN_DB if margin_db is None else margin_db
+    zcr_threshold = VAD_ZCR_THRESHOLD if zcr_threshold is None else zcr_threshold
+    padding_seconds = VAD_PADDING_SECONDS if padding_seconds is None else padding_seconds
+    frame = int(VAD_FRAME_SECONDS * SAMPLE_RATE)
+    count = len(audio) // frame
+    if not count:
+        return []
+
+    frames = np.asarray(audio[:count * frame], dtype=np.float32).reshape(count, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / frame
+    floor = min(float(np.percentile(energy_db, 10)), VAD_MAX_FLOOR_DB)
+    speech = (energy_db > floor + margin_db) | ((energy_db > floor + margin_db / 2) & (zcr > zcr_threshold))
+
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], speech.astype(np.int8), [0]])))
+    starts, ends = merge_runs(edges[::2], edges[1::2], VAD_MIN_SILENCE_SECONDS / VAD_FRAME_SECONDS)
+    long_enough = ends - starts >= VAD_MIN_SPEECH_SECONDS / VAD_FRAME_SECONDS
+    starts, ends = starts[long_enough] * frame, ends[long_enough] * frame
+    padding = int(padding_seconds * SAMPLE_RATE)
+    starts, ends = merge_runs(np.maximum(starts - padding, 0), np.minimum(ends + padding, len(audio)), 0)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+class SpeechMap:
+    """Speech regions of a span cut out and joined end to end, and the way from the joined audio back to the span"""
+
+    def __init__(self, regions):
+        import numpy as np
+
+        self.regions = regions
+        self.original_starts = np.array([start for start, _ in regions], dtype=np.int64)
+        self.lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self.compact_starts = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+
+    def compact(self, audio):
+        import numpy as np
+        return np.concatenate([audio[start:end] for start, end in self.regions])
+
+    def map_words(self, words, offset, limit):
+        """Words timed on the joined audio, moved onto the original timeline shifted by offset and clipped at limit"""
+        import numpy as np
+
+        if not words:
+            return []
+        starts = np.array([word["start"] for word in words]) * SAMPLE_RATE
+        ends = np.array([word["end"] for word in words]) * SAMPLE_RATE
+        last = len(self.regions) - 1
+        region = np.clip(np.searchsorted(self.compact_starts, starts, side="right") - 1, 0, last)
+        end_region = np.clip(np.searchsorted(self.compact_starts, ends, side="left") - 1, 0, last)
+        shift = self.original_starts[region] - self.compact_starts[region]
+        # A word running over a join would otherwise stretch across the cut out silence
+        new_starts = (starts + shift) / SAMPLE_RATE + offset
+        new_ends = np.where(end_region == region, ends + shift,
+                            self.original_starts[region] + self.lengths[region]) / SAMPLE_RATE + offset
+        mapped = []
+        for word, start, end in zip(words, new_starts.tolist(), new_ends.tolist()):
+            if start < limit:
+                mapped.append(dict(word, start=start, end=min(end, limit)))
+        return mapped
+
+
+def transcribe_span(model, audio, lang, offset=0.0, initial_prompt=None):
+    """Timed words and language of one span of audio that starts at offset seconds; with the VAD on, only the
+    speech in it goes through the model"""
+    limit = offset + len(audio) / SAMPLE_RATE
+    if not VAD_ENABLED:
+        result = run_whisper(model, audio, lang, initial_prompt=initial_prompt)
+        return result_words(result, offset, limit), result.get("language")
+    regions = detect_speech(audio)
+    if not regions:
+        return [], lang
+    speech = SpeechMap(regions)
+    result = run_whisper(model, speech.compact(audio), lang, initial_prompt=initial_prompt)
+    return speech.map_words(result_words(result), offset, limit), result.get("language")
+
+
+def as_audio_tensor(audio):
+    """Wrap decoded samples in a tensor without copying, so whisper reads straight from the mapping"""
+    import torch
+    return torch.from_numpy(audio)
+
+
+CLIP_BATCH_SIZE = 8
+# Whisper's window: clips up to this long take one slot of a batch without being cut
+CLIP_MAX_SECONDS = 30
+# The quality checks of whisper's transcribe(); clips failing them are transcribed again on their own,
+# where the temperature fallback gets another go at them
+CLIP_COMPRESSION_RATIO_LIMIT = 2.4
+CLIP_LOGPROB_LIMIT = -1.0
+CLIP_NO_SPEECH_LIMIT = 0.6
+
+
+def transcribe_clip_batch(model, clips, lang):
+    """Timed words and language of each of several short clips, with one encoder/decoder pass for all of them"""
+    return model_registry.backend.transcribe_batch(model, clips, lang)
+
+
+def split_at_silence(audio, chunk_seconds, search_seconds=20, frame_seconds=0.05, smooth_seconds=0.5):
+    """Cut audio into ~chunk_seconds spans, each cut placed at the quietest moment near the target boundary"""
+    import numpy as np
+
+    total = len(audio)
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    if total <= chunk * 1.5:
+        return [(0, total)]
+
+    search = min(int(search_seconds * SAMPLE_RATE), chunk // 4)
+    frame = int(frame_seconds * SAMPLE_RATE)
+    smooth = max(1, int(smooth_seconds / frame_seconds))
+    bounds = [0]
+    target = chunk
+    while target < total - chunk // 2:
+        lo = max(bounds[-1] + frame, target - search)
+        hi = min(total, target + search)
+        count = (hi - lo) // frame
+        if count < 1:
+            break
+        window = audio[lo:lo + count * frame].reshape(count, frame)
+        energy = np.mean(window.astype(np.float32) ** 2, axis=1)
+        kernel = np.ones(smooth)
+        energy = np.convolve(energy, kernel, mode="same") / np.convolve(np.ones(count), kernel, mode="same")
+        # Among (near) equally quiet frames take the one closest to the target
+        quiet = np.flatnonzero(energy <= energy.min() * 1.01 + 1e-12)
+        centers = lo + quiet * frame + frame // 2
+        cut = int(centers[np.argmin(np.abs(centers - target))])
+        bounds.append(cut)
+        target = cut + chunk
+    bounds.append(total)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def detect_chunk_language(audio, model_type):
+    with model_registry.use(model_type) as model:
+        probs = model_registry.backend.detect_language(model, audio)
+    return max(probs, key=probs.get) if probs else None
+
+
+def run_timed(func, *args):
+    """func(*args) in a pool worker, returned with the CPU seconds the worker spent on it"""
+    cpu_started = time.process_time()
+    result = func(*args)
+    return result, time.process_time() - cpu_started
+
+
+def transcribe_chunk(pcm_path, start, end, lang, model_type):
+    """Transcribe samples start:end of a cached PCM file; the worker maps the file itself instead of receiving a copy"""
+    import numpy as np
+
+    audio = np.memmap(pcm_path, dtype=np.float32, mode="c")[start:end]
+    with model_registry.use(model_type) as model:
+        words, _ = transcribe_span(model, audio, lang, start / SAMPLE_RATE)
+    return words
+
+
+def stitch_words(previous, words):
+    """Words of the next chunk without repeats of, or overlaps with, previous (the last word kept before the seam)"""
+    stitched = []
+    at_seam = previous is not None
+    for word in words:
+        if at_seam and word["start"] < previous["end"]:
+            if word["text"].strip().lower() == previous["text"].strip().lower():
+                continue
+            word = dict(word, start=previous["end"])
+            if word["start"] >= word["end"]:
+                continue
+        else:
+            at_seam = False
+        stitched.append(word)
+        previous = word
+    return stitched
+
+
+STREAM_WINDOW_SECONDS = 120
+PROMPT_WORDS = 40
+
+
+def transcribe_windows(model, audio, lang, on_words=None, cancel_event=None, telemetry=None,
+                       window_seconds=STREAM_WINDOW_SECONDS, journal=None):
+    """Transcribe audio window by window, handing each window's words to on_words as soon as it is decoded"""
+    telemetry = telemetry or JobTelemetry()
+    total_seconds = len(audio) / SAMPLE_RATE
+    words = []
+    for start, end in split_at_silence(audio, window_seconds):
+        entry = journal.get(start, end) if journal else None
+        if entry is not None:
+            window_words = entry["words"]
+            lang = lang or entry["language"]
+            telemetry.lang = lang
+            words.extend(window_words)
+            print(f"Resumed {end / SAMPLE_RATE:.0f}s of {total_seconds:.0f}s from the journal")
+            if on_words:
+                on_words(window_words, end / SAMPLE_RATE, total_seconds)
+            continue
+
+        check_cancelled(cancel_event)
+        # The tail of the previous window carries context across the cut, like whisper does between its 30s windows
+        prompt = " ".join(word["text"].strip() for word in words[-PROMPT_WORDS:]) or None
+        with telemetry.stage("inference"):
+            window_words, detected = transcribe_span(model, audio[start:end], lang, start / SAMPLE_RATE, prompt)
+        if lang is None:
+            lang = detected
+            telemetry.lang = lang
+        window_words = stitch_words(words[-1] if words else None, window_words)
+        if journal:
+            journal.append(start, end, lang, window_words)
+        words.extend(window_words)
+        print(f"Transcribed {end / SAMPLE_RATE:.0f}s of {total_seconds:.0f}s")
+        if on_words:
+            on_words(window_words, end / SAMPLE_RATE, total_seconds)
+    return words
+
+
+def transcribe_stream(video_path, model, lang, on_words=None, cancel_event=None, telemetry=None, journal=None,
+                      window_seconds=STREAM_WINDOW_SECONDS, overlap_seconds=STREAM_OVERLAP_SECONDS):
+    """transcribe_windows over fixed windows read straight from ffmpeg, so memory stays flat for any input length"""
+    telemetry = telemetry or JobTelemetry()
+    total_seconds = probe_duration(video_path)
+    window = int(window_seconds * SAMPLE_RATE)
+    step = window - int(overlap_seconds * SAMPLE_RATE)
+    half_overlap = int(overlap_seconds * SAMPLE_RATE) // 2
+    # Finished windows are kept as compact columns; only the last words stay dicts, for the prompt and the seam
+    tables = []
+    recent = deque(maxlen=PROMPT_WORDS)
+    # Words of the previous window past the middle of the overlap; the next window heard them with more context
+    held = []
+    processed_seconds = 0.0
+    windows = stream_audio(video_path, window_seconds, overlap_seconds)
+    try:
+        while True:
+            with telemetry.stage("decode"):
+                item = next(windows, None)
+            if item is None:
+                break
+            offset, audio = item
+            start, end = offset, offset + len(audio)
+            seam = (offset + half_overlap) / SAMPLE_RATE if offset else 0.0
+            entry = journal.get(start, end) if journal else None
+            if entry is not None:
+                window_words = entry["words"]
+                lang = lang or entry["language"]
+            else:
+                check_cancelled(cancel_event)
+                prompt = " ".join(word["text"].strip() for word in recent) or None
+                with telemetry.stage("inference"):
+                    window_words, detected = transcribe_span(model, audio, lang, start / SAMPLE_RATE, prompt)
+                lang = lang or detected
+                window_words = [word for word in window_words if word["start"] >= seam]
+                window_words = stitch_words(recent[-1] if recent else None, window_words)
+                if journal:
+                    journal.append(start, end, lang, window_words)
+            telemetry.lang = lang
+
+            if len(audio) < window:
+                held = []
+                emitted = window_words
+            else:
+                next_seam = (offset + step + half_overlap) / SAMPLE_RATE
+                cut = next((index for index, word in enumerate(window_words) if word["start"] >= next_seam),
+                           len(window_words))
+                emitted, held = window_words[:cut], window_words[cut:]
+            tables.append(WordTable.from_words(emitted))
+            recent.extend(emitted)
+            processed_seconds = end / SAMPLE_RATE
+            telemetry.audio_seconds = processed_seconds
+            print(f"Transcribed {processed_seconds:.0f}s of {total_seconds or processed_seconds:.0f}s (streamed)")
+            if on_words:
+                on_words(emitted, processed_seconds, max(total_seconds or 0.0, processed_seconds))
+    finally:
+        # Stops ffmpeg when the job is cancelled or fails halfway
+        windows.close()
+    if held:
+        # The input ended exactly at a window boundary, so no later window covers these
+        tables.append(WordTable.from_words(held))
+        if on_words:
+            on_words(held, processed_seconds, processed_seconds)
+    return WordTable.concat(tables)
+
+
+def use_stream_decode(video_path):
+    if os.path.exists(pcm_cache_path(video_path)):
+        return False
+    if STREAM_DECODE_MIN_HOURS <= 0:
+        return True
+    duration = probe_duration(video_path)
+    return duration is not None and duration >= STREAM_DECODE_MIN_HOURS * 3600
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled("Job was cancelled")
+
+
+def cancellable(model, cancel_event):
+    """Abort a running transcribe() at the next 30 second window once cancel_event is set"""
+    return model_registry.backend.cancellable(model, cancel_event)
+
+
+def transcribe_long_file(video_path, lang, model_type, chunk_pool, chunk_seconds=LONG_FILE_CHUNK_SECONDS,
+                         cancel_event=None, telemetry=None, on_words=None, journal=None):
+    telemetry = telemetry or JobTelemetry(video_path, model_type, lang)
+    with telemetry.stage("decode"):
+        audio = decode_audio(video_path)
+    telemetry.audio_seconds = len(audio) / SAMPLE_RATE
+    if not len(audio):
+        return []
+    with telemetry.stage("split"):
+        spans = split_at_silence(audio, chunk_seconds)
+    print(f"Split {len(audio) / SAMPLE_RATE:.0f}s of audio into {len(spans)} chunks")
+
+    done = {span: journal.get(*span) for span in spans if journal and journal.get(*span)}
+    if done:
+        print(f"Resuming: {len(done)} of {len(spans)} chunks are already in the journal")
+    if lang is None and done:
+        lang = next(iter(done.values()))["language"]
+        telemetry.lang = lang
+    if lang is None:
+        middle = len(audio) // 2
+        sample = audio[max(0, middle - 15 * SAMPLE_RATE):middle + 15 * SAMPLE_RATE]
+        with telemetry.stage("language_detection"):
+            lang, worker_cpu = chunk_pool.submit(run_timed, detect_chunk_language, sample, model_type).result()
+        telemetry.add_worker_cpu("language_detection", worker_cpu)
+        telemetry.lang = lang
+        print(f"Detected language: {lang}")
+
+    futures = {(start, end): chunk_pool.submit(run_timed, transcribe_chunk, audio.filename, start, end, lang,
+                                               model_type)
+               for start, end in spans if (start, end) not in done}
+    words = []
+    try:
+        # Chunks finish in any order but are handed on in file order, each as soon as its predecessors are done
+        for number, (start, end) in enumerate(spans, start=1):
+            check_cancelled(cancel_event)
+            if (start, end) in done:
+                chunk_words = done[(start, end)]["words"]
+            else:
+                with telemetry.stage("inference"):
+                    chunk_words, worker_cpu = futures[(start, end)].result()
+                    chunk_words = stitch_words(words[-1] if words else None, chunk_words)
+                telemetry.add_worker_cpu("inference", worker_cpu)
+                if journal:
+                    journal.append(start, end, lang, chunk_words)
+            words.extend(chunk_words)
+            print(f"Chunk {number}/{len(spans)} done")
+            if on_words:
+                on_words(chunk_words, end / SAMPLE_RATE, len(audio) / SAMPLE_RATE)
+    except BaseException:
+        for future in futures.values():
+            future.cancel()
+        raise
+    return words
+
+
+WORD_CACHE_MAX_MB = int(os.environ.get("SRTING_WORD_CACHE_MB", "512"))
+WORD_CACHE_KEYS = ("text", "start", "end", "confidence")
+WORD_CACHE_WRITE_WORDS = 10000
+
+_file_hashes = {}
+
+
+def file_content_hash(file_path):
+    """Hash of the file contents, remembered per path/size/mtime so a file is only read once per session"""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def evict_cache_dir(cache_dir, max_bytes, keep=None):
+    """Delete the least recently used files until the folder fits in max_bytes"""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.path != keep and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError as e:
+            print(f"Error evicting cache file {path}: {str(e)}")
+
+
+def vad_signature():
+    """Short hash of every VAD setting, so retuned thresholds don't reuse words found with the old speech regions"""
+    settings = (VAD_MARGIN_DB, VAD_ZCR_THRESHOLD, VAD_PADDING_SECONDS, VAD_FRAME_SECONDS, VAD_MIN_SPEECH_SECONDS,
+                VAD_MIN_SILENCE_SECONDS, VAD_MAX_FLOOR_DB)
+    return hashlib.blake2b(repr(settings).encode(), digest_size=4).hexdigest()
+
+
+def transcription_key(video_path, model_type, lang):
+    """What a transcription depends on; VAD runs skip audio, so they are kept apart from full runs and from runs
+    with other VAD settings"""
+    vad = f"-vad{vad_signature()}" if VAD_ENABLED else ""
+    return f"{file_content_hash(video_path)}-{model_type}{vad}-{lang or 'auto'}"
+
+
+def word_cache_path(video_path, model_type, lang):
+    name = f"{transcription_key(video_path, model_type, lang)}.json.gz"
+    return os.path.join(app_cache_dir("words"), name)
+
+
+def load_cached_words(video_path, model_type, lang):
+    try:
+        cache_path = word_cache_path(video_path, model_type, lang)
+        if not os.path.exists(cache_path):
+            return None
+        with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+            words = json.load(f)
+        os.utime(cache_path)
+        return words
+    except Exception as e:
+        print(f"Error reading word cache: {str(e)}")
+        return None
+
+
+def store_cached_words(video_path, model_type, lang, words):
+    try:
+        cache_path = word_cache_path(video_path, model_type, lang)
+        table = WordTable.from_words(words)
+        temp_path = cache_path + ".tmp"
+        # Written a slice at a time, so a long recording is never held as dicts all at once
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            f.write("[")
+            for lo in range(0, len(table), WORD_CACHE_WRITE_WORDS):
+                batch = table.slice(lo, min(len(table), lo + WORD_CACHE_WRITE_WORDS)).to_words()
+                f.write(("," if lo else "") + json.dumps(batch, ensure_ascii=False, separators=(",", ":"))[1:-1])
+            f.write("]")
+        os.replace(temp_path, cache_path)
+        evict_cache_dir(os.path.dirname(cache_path), WORD_CACHE_MAX_MB * 1024 * 1024)
+    except Exception as e:
+        print(f"Error writing word cache: {str(e)}")
+
+
+LANGUAGE_PREPASS_ENABLED = os.environ.get("SRTING_LANGUAGE_PREPASS", "1") == "1"
+LANGUAGE_PREPASS_MODEL = "tiny"
+# Together the samples fill exactly one 30 second window, so the pre-pass is a single encoder run
+LANGUAGE_SAMPLES = 5
+LANGUAGE_SAMPLE_SECONDS = 6
+# Below this the pre-pass is not trusted and the job stays in auto mode, e.g. for files mixing languages
+LANGUAGE_MIN_PROBABILITY = 0.6
+LANGUAGE_CACHE_MAX_MB = 1
+# Sizes that also come as an English-only model, which is faster and more accurate on English
+ENGLISH_ONLY_MODELS = ("tiny", "base", "small", "medium")
+
+
+def read_audio_at(video_path, start, seconds):
+    """Decode only seconds of audio from start, letting ffmpeg seek instead of reading the file up to there"""
+    import numpy as np
+    import subprocess
+
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-ss", f"{start:.3f}", "-t", f"{seconds:.3f}",
+           "-i", video_path, "-vn", "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(SAMPLE_RATE),
+           "pipe:1"]
+    completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if completed.returncode:
+        raise RuntimeError(f"Failed to decode audio: {completed.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(bytearray(completed.stdout), dtype=np.float32)
+
+
+def language_samples(video_path):
+    """A few short excerpts spread evenly over the file, cut from the PCM cache when the file is in it and
+    otherwise decoded one by one with ffmpeg seeking to them"""
+    if os.path.exists(pcm_cache_path(video_path)):
+        audio = decode_audio(video_path)
+        duration = len(audio) / SAMPLE_RATE
     else:
-        print(f"Logo not found at: {logo_path}")
-except Exception as e:
-    print(f"Error loading logo: {str(e)}")
+        # Decoding the whole file for 30 seconds of it would cost as much as the pre-pass saves
+        audio = None
+        duration = probe_duration(video_path) or 0.0
+    count = max(1, min(LANGUAGE_SAMPLES, int(duration // LANGUAGE_SAMPLE_SECONDS)))
+    starts = [max(0.0, duration - LANGUAGE_SAMPLE_SECONDS) * (index + 0.5) / count for index in range(count)]
+    samples = []
+    for start in starts:
+        if audio is None:
+            sample = read_audio_at(video_path, start, LANGUAGE_SAMPLE_SECONDS)
+        else:
+            sample = audio[int(start * SAMPLE_RATE):int((start + LANGUAGE_SAMPLE_SECONDS) * SAMPLE_RATE)]
+        if len(sample):
+            samples.append(sample)
+    return samples
+
+
+def detect_file_language(video_path):
+    """(language, probability) of the whole file, from language_samples joined into one window and run through
+    the smallest model; (None, 0.0) when it can't tell"""
+    import numpy as np
+
+    samples = language_samples(video_path)
+    if not samples:
+        return None, 0.0
+    with model_registry.use(LANGUAGE_PREPASS_MODEL) as model:
+        probs = model_registry.backend.detect_language(model, np.concatenate(samples))
+    if not probs:
+        return None, 0.0
+    language = max(probs, key=probs.get)
+    return language, probs[language]
+
+
+def language_cache_path(video_path):
+    return os.path.join(app_cache_dir("languages"), f"{file_content_hash(video_path)}.json")
 
 
-def format_timestamp(seconds):
+def load_cached_language(video_path):
     try:
-        millis = int((seconds - int(seconds)) * 1000)
-        return f"{int(seconds // 3600):02}:{int((seconds % 3600) // 60):02}:{int(seconds % 60):02},{millis:03d}"
+        cache_path = language_cache_path(video_path)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            detected = json.load(f)
+        os.utime(cache_path)
+        return detected["language"], detected["probability"]
     except Exception as e:
-        print(f"Error formatting timestamp: {str(e)}")
-        return "00:00:00,000"
+        print(f"Error reading language cache: {str(e)}")
+        return None
 
 
-def transcribe_word_by_word(video_path, output_srt, lang, model_type, group_size):
+def store_cached_language(video_path, language, probability):
     try:
-        print(f"Loading model: {model_type}")
-        model = load_model(model_type)
+        cache_path = language_cache_path(video_path)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"language": language, "probability": probability}, f)
+        os.replace(temp_path, cache_path)
+        evict_cache_dir(os.path.dirname(cache_path), LANGUAGE_CACHE_MAX_MB * 1024 * 1024)
+    except Exception as e:
+        print(f"Error writing language cache: {str(e)}")
 
-        print(f"Starting transcription of: {video_path}")
-        result = transcribe(model, video_path, language=lang)
-        print("Transcription complete, processing segments")
 
-        index = 1
-        grouped = []
-        buffer = []
+def english_only_model(model_type):
+    """The English-only variant of model_type, or model_type itself when it has none"""
+    quantized = model_type.endswith(QUANTIZED_SUFFIX)
+    model_name = model_type[:-len(QUANTIZED_SUFFIX)] if quantized else model_type
+    if model_name not in ENGLISH_ONLY_MODELS:
+        return model_type
+    return f"{model_name}.en{QUANTIZED_SUFFIX if quantized else ''}"
 
-        for segment in result["segments"]:
-            for word in segment["words"]:
-                if word.get("start") is None or word.get("end") is None:
-                    continue
-                buffer.append(word)
-                if len(buffer) == group_size:
-                    grouped.append(buffer)
-                    buffer = []
-        if buffer:
-            grouped.append(buffer)
-
-        print(f"Writing SRT to: {output_srt}")
-        with open(output_srt, "w", encoding="utf-8") as srt_file:
-            for group in grouped:
-                start = format_timestamp(group[0]["start"])
-                end = format_timestamp(group[-1]["end"])
-                text = " ".join([w["text"].strip() for w in group])
-                srt_file.write(f"{index}\n{start} --> {end}\n{text}\n\n")
-                index += 1
-
-        print(f"SRT file created with {index - 1} subtitle entries")
+
+def route_auto_language(video_path, model_type, telemetry):
+    """Language and model for a job in auto mode: the language found by the pre-pass when it is sure enough, and
+    for English the English-only model of the same size"""
+    detected = load_cached_language(video_path)
+    if detected is None:
+        try:
+            with telemetry.stage("language_detection"):
+                detected = detect_file_language(video_path)
+        except Exception as e:
+            print(f"Error detecting language: {str(e)}")
+            return None, model_type
+        if detected[0] is not None:
+            store_cached_language(video_path, *detected)
+    language, probability = detected
+    if language is None or probability < LANGUAGE_MIN_PROBABILITY:
+        return None, model_type
+    if language == "en":
+        model_type = english_only_model(model_type)
+    print(f"Detected language: {language} ({probability:.0%}), transcribing with model: {model_type}")
+    return language, model_type
+
+
+def resolve_language(video_path, lang, model_type, telemetry):
+    """Language and model a job really runs with; only auto jobs can change, through the pre-pass"""
+    if lang is None and LANGUAGE_PREPASS_ENABLED:
+        lang, model_type = route_auto_language(video_path, model_type, telemetry)
+        telemetry.lang, telemetry.model_type = lang, model_type
+    return lang, model_type
+
+
+def pool_model(lang, model_type):
+    """Model a worker pool can preload: unknown while the pre-pass still has to route each auto file"""
+    return None if lang is None and LANGUAGE_PREPASS_ENABLED else model_type
+
+
+class TranscriptionJournal:
+    """Append-only record of the finished windows of one file/model/language, so an interrupted run can resume"""
+
+    def __init__(self, video_path, model_type, lang):
+        name = f"{transcription_key(video_path, model_type, lang)}.jsonl"
+        self.path = os.path.join(app_cache_dir("journals"), name)
+        # Only the windows read back for a resume; appended ones are on disk but not kept in memory
+        self.windows = {}
+        if os.path.exists(self.path):
+            self._read()
+        # Journals of runs that were never finished are dropped like old cache entries
+        evict_cache_dir(os.path.dirname(self.path), WORD_CACHE_MAX_MB * 1024 * 1024, keep=self.path)
+
+    def _read(self):
+        good_bytes = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    self.windows[(entry["start"], entry["end"])] = entry
+                    good_bytes += len(line)
+            # A line cut off when the app was killed mid-write is dropped, so the next append starts on a clean line
+            if good_bytes != os.path.getsize(self.path):
+                os.truncate(self.path, good_bytes)
+        except Exception as e:
+            print(f"Error reading journal {self.path}: {str(e)}")
+        if self.windows:
+            print(f"Found journal with {len(self.windows)} finished window(s): {self.path}")
+
+    def get(self, start, end):
+        return self.windows.get((start, end))
+
+    def append(self, start, end, lang, words):
+        entry = {"start": start, "end": end, "language": lang,
+                 "words": [{key: word[key] for key in WORD_CACHE_KEYS if key in word} for word in words]}
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error writing journal: {str(e)}")
+
+    def remove(self):
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            print(f"Error removing journal: {str(e)}")
+
+
+TELEMETRY_LOG_MAX_MB = 5
+TELEMETRY_LOG_BACKUPS = 3
+
+_telemetry_logger = None
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, or None where it can't be read"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except Exception:
+        return None
+
+
+def current_rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except Exception:
+        return None
+
+
+class RssSampler:
+    """Highest resident memory seen while the block runs, sampled from a background thread; unlike peak_rss_mb
+    it isn't stuck at the highest point of everything that ran in the process before"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def telemetry_logger():
+    """JSON-lines logger for job telemetry, rotated by size in the app cache folder"""
+    global _telemetry_logger
+    if _telemetry_logger is None:
+        logger = logging.getLogger("srting.telemetry")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(
+            os.path.join(app_cache_dir("logs"), "telemetry.jsonl"), maxBytes=TELEMETRY_LOG_MAX_MB * 1024 * 1024,
+            backupCount=TELEMETRY_LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        _telemetry_logger = logger
+    return _telemetry_logger
+
+
+class JobTelemetry:
+    """Wall time, CPU time and memory of every stage of one transcription"""
+
+    def __init__(self, video_path=None, model_type=None, lang=None):
+        self.video_path = video_path
+        self.model_type = model_type
+        self.lang = lang
+        self.audio_seconds = None
+        self.stages = []
+
+    def _entry(self, name):
+        # A stage entered repeatedly (once per streamed window) adds up into a single entry
+        entry = next((stage for stage in self.stages if stage["stage"] == name), None)
+        if entry is None:
+            entry = {"stage": name, "wall_seconds": 0.0, "cpu_seconds": 0.0, "worker_cpu_seconds": 0.0,
+                     "peak_rss_mb": None}
+            self.stages.append(entry)
+        return entry
+
+    @contextmanager
+    def stage(self, name):
+        """cpu_seconds is this process only; time spent in pool workers is added with add_worker_cpu"""
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        memory = RssSampler()
+        try:
+            with memory:
+                yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_started
+            cpu_seconds = time.process_time() - cpu_started
+            entry = self._entry(name)
+            entry["wall_seconds"] = round(entry["wall_seconds"] + wall_seconds, 4)
+            entry["cpu_seconds"] = round(entry["cpu_seconds"] + cpu_seconds, 4)
+            entry["rss_mb"] = current_rss_mb()
+            if memory.peak is not None and (entry["peak_rss_mb"] is None or memory.peak > entry["peak_rss_mb"]):
+                entry["peak_rss_mb"] = memory.peak
+
+    def add_worker_cpu(self, name, cpu_seconds):
+        entry = self._entry(name)
+        entry["worker_cpu_seconds"] = round(entry["worker_cpu_seconds"] + cpu_seconds, 4)
+
+    def peak_rss_mb(self):
+        peaks = [stage["peak_rss_mb"] for stage in self.stages if stage["peak_rss_mb"] is not None]
+        return max(peaks) if peaks else None
+
+    def total_seconds(self):
+        return sum(stage["wall_seconds"] for stage in self.stages)
+
+    def realtime_factor(self):
+        if not self.audio_seconds:
+            return None
+        return self.total_seconds() / self.audio_seconds
+
+    def record(self, status="done"):
+        rtf = self.realtime_factor()
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "file": self.video_path,
+            "model": self.model_type,
+            "language": self.lang,
+            "status": status,
+            "audio_seconds": self.audio_seconds,
+            "total_seconds": round(self.total_seconds(), 4),
+            "realtime_factor": round(rtf, 4) if rtf is not None else None,
+            "peak_rss_mb": self.peak_rss_mb(),
+            "process_peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+        }
+
+    def summary(self):
+        parts = [f"{stage['stage']} {stage['wall_seconds']:.2f}s" for stage in self.stages]
+        text = " | ".join(parts + [f"total {self.total_seconds():.1f}s"])
+        rtf = self.realtime_factor()
+        if rtf is not None:
+            text += f" for {self.audio_seconds:.1f}s of audio (RTF {rtf:.2f})"
+        return text
+
+    def write(self, status="done"):
+        try:
+            telemetry_logger().info(json.dumps(self.record(status), ensure_ascii=False))
+        except Exception as e:
+            print(f"Error writing telemetry: {str(e)}")
+
+
+def transcribe_words(video_path, lang, model_type, chunk_pool=None, chunk_seconds=LONG_FILE_CHUNK_SECONDS,
+                     use_cache=True, cancel_event=None, telemetry=None, on_words=None):
+    """All timed words of a file as a WordTable; on_words(words, processed_seconds, total_seconds) also receives
+    them as they come"""
+    telemetry = telemetry or JobTelemetry(video_path, model_type, lang)
+    lang, model_type = resolve_language(video_path, lang, model_type, telemetry)
+    if use_cache:
+        with telemetry.stage("cache_lookup"):
+            words = load_cached_words(video_path, model_type, lang)
+        if words is not None:
+            print(f"Using cached transcription of: {video_path}")
+            if on_words:
+                duration = words[-1]["end"] if words else 0.0
+                on_words(words, duration, duration)
+            return WordTable.from_words(words)
+
+    # Without the cache nothing is resumed either, every run starts from scratch
+    journal = TranscriptionJournal(video_path, model_type, lang) if use_cache else None
+    if chunk_pool is not None:
+        print(f"Starting long file transcription of: {video_path}")
+        words = transcribe_long_file(video_path, lang, model_type, chunk_pool, chunk_seconds, cancel_event, telemetry,
+                                     on_words, journal)
+    elif use_stream_decode(video_path):
+        with telemetry.stage("model_load"):
+            model_registry.get(model_type)
+        with model_registry.use(model_type) as model:
+            check_cancelled(cancel_event)
+            print(f"Starting streamed transcription of: {video_path}")
+            with cancellable(model, cancel_event):
+                words = transcribe_stream(video_path, model, lang, on_words, cancel_event, telemetry, journal)
+    else:
+        with telemetry.stage("decode"):
+            audio = decode_audio(video_path)
+        telemetry.audio_seconds = len(audio) / SAMPLE_RATE
+        check_cancelled(cancel_event)
+        with telemetry.stage("model_load"):
+            model_registry.get(model_type)
+        with model_registry.use(model_type) as model:
+            check_cancelled(cancel_event)
+            print(f"Starting transcription of: {video_path}")
+            with cancellable(model, cancel_event):
+                words = transcribe_windows(model, audio, lang, on_words, cancel_event, telemetry, journal=journal)
+    words = WordTable.from_words(words)
+    if use_cache:
+        store_cached_words(video_path, model_type, lang, words)
+        journal.remove()
+    return words
+
+
+def transcribe_word_by_word(video_path, output_srt, lang, model_type, group_size, chunk_pool=None,
+                            chunk_seconds=LONG_FILE_CHUNK_SECONDS, use_cache=True, cancel_event=None,
+                            telemetry=None, on_progress=None):
+    """Transcribe into output_srt, appending cues while decoding; on_progress(processed, total, latest_cues)"""
+    telemetry = telemetry or JobTelemetry(video_path, model_type, lang)
+    try:
+        with StreamingSrtWriter(output_srt, group_size, telemetry=telemetry) as writer:
+            def on_words(words, processed_seconds, total_seconds):
+                writer.add(words)
+                if on_progress:
+                    on_progress(processed_seconds, total_seconds, list(writer.latest_cues))
+
+            transcribe_words(video_path, lang, model_type, chunk_pool, chunk_seconds, use_cache, cancel_event,
+                             telemetry, on_words)
+            check_cancelled(cancel_event)
+        print(f"SRT file created with {writer.count} subtitle entries")
+        print(f"Timing: {telemetry.summary()}")
+        telemetry.write()
         return output_srt
+    except JobCancelled:
+        print(f"Transcription cancelled: {video_path}")
+        telemetry.write("cancelled")
+        raise
     except Exception as e:
         print(f"Error in transcription: {str(e)}")
         traceback.print_exc()
+        telemetry.write("failed")
         raise
 
 
+class TranscriptionJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, video_path, output_srt, lang, model_type, group_size, long_file=False):
+        self.id = next(TranscriptionJob._ids)
+        self.video_path = video_path
+        self.output_srt = output_srt
+        self.lang = lang
+        self.model_type = model_type
+        self.group_size = group_size
+        self.long_file = long_file
+        self.status = "pending"
+        self.error = None
+        self.words = None
+        self.telemetry = JobTelemetry(video_path, model_type, lang)
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress_seconds = 0.0
+        self.total_seconds = None
+        self.latest_cues = []
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def set_progress(self, processed_seconds, total_seconds, latest_cues=None):
+        self.progress_seconds = processed_seconds
+        self.total_seconds = total_seconds
+        if latest_cues is not None:
+            self.latest_cues = latest_cues
+
+    def progress_fraction(self):
+        if self.status == "done":
+            return 1.0
+        if not self.total_seconds:
+            return 0.0
+        return min(1.0, self.progress_seconds / self.total_seconds)
+
+    def eta_seconds(self):
+        """Remaining time at the rate audio has been processed so far, None until the first window is done"""
+        if self.status != "running" or not self.started_at or not self.progress_seconds or not self.total_seconds:
+            return None
+        elapsed = time.time() - self.started_at
+        return max(0.0, elapsed * (self.total_seconds - self.progress_seconds) / self.progress_seconds)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobScheduler:
+    """Runs queued jobs on up to max_concurrent threads, preferring jobs whose model is already loaded"""
+
+    def __init__(self, run_job, max_concurrent=1, max_pending=None, on_change=None):
+        self.run_job = run_job
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_pending = max_pending
+        self.on_change = on_change
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def submit(self, job):
+        with self._lock:
+            if self.max_pending is not None and self.count("pending") >= self.max_pending:
+                raise QueueFull(f"Queue is full ({self.max_pending} pending jobs)")
+            self.jobs.append(job)
+            self._dispatch_locked()
+        self._changed(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return next((job for job in self.jobs if job.id == job_id), None)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = next((job for job in self.jobs if job.id == job_id), None)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            if job.status == "pending":
+                job.status = "cancelled"
+                job.finished_at = time.time()
+        self._changed(job)
+        return True
+
+    def set_max_concurrent(self, max_concurrent):
+        with self._lock:
+            self.max_concurrent = max(1, max_concurrent)
+            self._dispatch_locked()
+
+    def prune(self, keep):
+        """Forget the oldest finished jobs so that at most keep finished jobs are remembered; returns the dropped jobs"""
+        with self._lock:
+            finished = [job for job in self.jobs if job.finished]
+            dropped = finished[:max(0, len(finished) - keep)]
+            self.jobs = [job for job in self.jobs if job not in dropped]
+        return dropped
+
+    def position(self, job):
+        with self._lock:
+            pending = [other for other in self.jobs if other.status == "pending"]
+            return pending.index(job) + 1 if job in pending else 0
+
+    def count(self, *statuses):
+        return sum(1 for job in self.jobs if job.status in statuses)
+
+    def idle(self):
+        with self._lock:
+            return not self.count("pending", "running")
+
+    def _next_job_locked(self):
+        pending = [job for job in self.jobs if job.status == "pending"]
+        if not pending:
+            return None
+        busy = {job.model_type for job in self.jobs if job.status == "running"}
+        # A model already busy would make the job wait on it; a loaded model saves the load; otherwise FIFO
+        return min(pending, key=lambda job: (job.model_type in busy, not model_registry.is_loaded(job.model_type),
+                                             job.id))
+
+    def _dispatch_locked(self):
+        while self.count("running") < self.max_concurrent:
+            job = self._next_job_locked()
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        self._changed(job)
+        try:
+            self.run_job(job)
+            status, error = "done", None
+        except JobCancelled:
+            status, error = "cancelled", None
+        except Exception as e:
+            status, error = "failed", str(e)
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._dispatch_locked()
+        self._changed(job)
+
+    def _changed(self, job):
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception as e:
+                print(f"Error reporting job change: {str(e)}")
+
+
+def default_output_path(file_path, output_dir=None):
+    base_filename = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir if output_dir else os.path.dirname(file_path),
+                        base_filename + "_subtitles.srt")
+
+
+def is_supported_file(file_path):
+    return any(file_path.lower().endswith(ext) for ext in SUPPORTED_FORMATS)
+
+
+def collect_media_files(inputs, recursive=False):
+    """Expand files, folders and glob patterns into (file, subfolder) pairs, subfolder relative to the input folder"""
+    found = []
+    seen = set()
+
+    def add(file_path, rel_dir=""):
+        key = os.path.normcase(os.path.abspath(file_path))
+        if key not in seen and is_supported_file(file_path):
+            seen.add(key)
+            found.append((file_path, rel_dir))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for root_dir, dirs, files in os.walk(item):
+                    dirs.sort()
+                    for name in sorted(files):
+                        add(os.path.join(root_dir, name), os.path.relpath(root_dir, item))
+            else:
+                for name in sorted(os.listdir(item)):
+                    add(os.path.join(item, name))
+        elif os.path.isfile(item):
+            add(item)
+        else:
+            matches = sorted(glob.glob(item, recursive=True))
+            if not matches:
+                print(f"No files match: {item}")
+            for match in matches:
+                if os.path.isfile(match):
+                    add(match)
+    return [(path, "" if rel_dir == "." else rel_dir) for path, rel_dir in found]
+
+
+def init_batch_worker(model_type, threads):
+    """Runs once in every worker process: set up assets and keep the model loaded for all its files; without a
+    model_type the workers load whatever model their first file needs"""
+    run_startup_checks()
+    try:
+        configure_torch_threads(TORCH_INTRA_OP_THREADS or threads)
+    except Exception as e:
+        print(f"Error setting torch threads: {str(e)}")
+    if model_type is None:
+        return
+    try:
+        model_registry.get(model_type)
+    except Exception as e:
+        # Every file will report the load error on its own instead of breaking the whole pool
+        print(f"Error loading model {model_type} in worker: {str(e)}")
+
+
+def make_worker_pool(workers, model_type):
+    """Process pool whose workers each keep model_type loaded; spawned so it is safe next to Tk and threads"""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=init_batch_worker, initargs=(model_type, threads))
+
+
+def batch_transcribe_file(video_path, output_srt, lang, model_type, group_size, chunk_pool=None,
+                          chunk_seconds=LONG_FILE_CHUNK_SECONDS, use_cache=True):
+    started = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(output_srt)), exist_ok=True)
+        transcribe_word_by_word(video_path, output_srt, lang, model_type, group_size, chunk_pool, chunk_seconds,
+                                use_cache)
+        return video_path, output_srt, None, time.perf_counter() - started
+    except Exception as e:
+        return video_path, output_srt, f"{type(e).__name__}: {str(e)}", time.perf_counter() - started
+
+
+def batch_transcribe_clips(clips, lang, model_type, use_cache=True):
+    """Transcribe several short files, given as (video_path, output_srt, group_size), in one batched model pass;
+    one batch_transcribe_file style result per file, all timed with the whole batch"""
+    started = time.perf_counter()
+    telemetry = JobTelemetry(f"{len(clips)} clips", model_type, lang)
+    failures = {}
+    pending = []
+    for video_path, output_srt, group_size in clips:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(output_srt)), exist_ok=True)
+            words = load_cached_words(video_path, model_type, lang) if use_cache else None
+            if words is not None:
+                print(f"Using cached transcription of: {video_path}")
+                write_srt(words, output_srt, group_size)
+                continue
+            with telemetry.stage("decode"):
+                pending.append((video_path, output_srt, group_size, decode_audio(video_path)))
+        except Exception as e:
+            failures[video_path] = f"{type(e).__name__}: {str(e)}"
+
+    if pending:
+        telemetry.audio_seconds = sum(len(audio) for *_, audio in pending) / SAMPLE_RATE
+        try:
+            with telemetry.stage("model_load"):
+                model_registry.get(model_type)
+            with model_registry.use(model_type) as model:
+                print(f"Starting batched transcription of {len(pending)} clips")
+                with telemetry.stage("inference"):
+                    transcribed = transcribe_clip_batch(model, [audio for *_, audio in pending], lang)
+        except Exception as e:
+            print(f"Error in batched transcription: {str(e)}")
+            traceback.print_exc()
+            telemetry.write("failed")
+            for video_path, *_ in pending:
+                failures[video_path] = f"{type(e).__name__}: {str(e)}"
+        else:
+            for (video_path, output_srt, group_size, _), (words, _) in zip(pending, transcribed):
+                try:
+                    if use_cache:
+                        store_cached_words(video_path, model_type, lang, words)
+                    with telemetry.stage("srt_write"):
+                        write_srt(words, output_srt, group_size)
+                except Exception as e:
+                    failures[video_path] = f"{type(e).__name__}: {str(e)}"
+            print(f"Timing: {telemetry.summary()}")
+            telemetry.write()
+
+    elapsed = time.perf_counter() - started
+    return [(video_path, output_srt, failures.get(video_path), elapsed) for video_path, output_srt, _ in clips]
+
+
+def run_batch(args):
+    run_startup_checks()
+    if app_state.show_ffmpeg_error and not args.server:
+        print("ffmpeg was not found. This application requires ffmpeg to work properly.")
+        return 2
+
+    files = collect_media_files(args.inputs, recursive=args.recursive)
+    if not files:
+        print("No supported media files found.")
+        return 2
+
+    lang = None if args.language == "auto" else args.language
+    use_cache = not args.no_cache
+    rules = GroupingRules(args.words_per_line, args.max_chars, args.max_duration, args.split_gap)
+    jobs = []
+    for file_path, rel_dir in files:
+        output_dir = os.path.join(args.output_dir, rel_dir) if args.output_dir else None
+        output_srt = default_output_path(file_path, output_dir)
+        if args.skip_existing and os.path.exists(output_srt):
+            print(f"SKIP {file_path} (already exists: {output_srt})")
+            continue
+        jobs.append((file_path, output_srt, lang, args.model, rules))
+
+    # Short clips go through the model several at a time, everything else file by file
+    clip_batches = []
+    if args.clip_batch > 1 and not args.server and not args.long_file:
+        short = [(probe_duration(job[0]) or CLIP_MAX_SECONDS + 1) <= CLIP_MAX_SECONDS for job in jobs]
+        clips = [job for job, is_short in zip(jobs, short) if is_short]
+        jobs = [job for job, is_short in zip(jobs, short) if not is_short]
+        clip_batches = [[(file_path, output_srt, rules) for file_path, output_srt, _, _, rules in
+                         clips[start:start + args.clip_batch]] for start in range(0, len(clips), args.clip_batch)]
+    total = len(jobs) + sum(len(batch) for batch in clip_batches)
+
+    if args.long_file:
+        workers = max(1, args.workers)
+    else:
+        workers = max(1, min(args.workers, len(jobs) + len(clip_batches))) if total else 1
+    print(f"Transcribing {total} file(s) with model: {args.model}, language: {lang}, workers: {workers}")
+    if clip_batches:
+        print(f"{total - len(jobs)} short clip(s) in {len(clip_batches)} batch(es) of up to {args.clip_batch}")
+    started = time.perf_counter()
+
+    failed = 0
+    done = 0
+
+    def report(result):
+        nonlocal failed, done
+        file_path, output_srt, error, elapsed = result
+        done += 1
+        if error:
+            failed += 1
+            print(f"[{done}/{total}] FAIL {file_path} ({elapsed:.1f}s): {error}")
+        else:
+            print(f"[{done}/{total}] OK   {file_path} -> {output_srt} ({elapsed:.1f}s)")
+
+    if args.server:
+        server_url = args.server.rstrip("/")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(remote_transcribe_file, server_url, *job) for job in jobs]
+            for future in as_completed(futures):
+                report(future.result())
+    elif args.long_file:
+        # Auto files are routed before the pool starts, so its workers preload the model most of them will use
+        # instead of args.model next to the English-only one
+        jobs = [(file_path, output_srt) + resolve_language(file_path, job_lang, model_type, JobTelemetry()) + (rules,)
+                for file_path, output_srt, job_lang, model_type, rules in jobs]
+        preload = Counter(model_type for _, _, _, model_type, _ in jobs).most_common(1)[0][0] if jobs else args.model
+        # Files go one after another, the chunks of each file are spread over the workers
+        with make_worker_pool(workers, preload) as chunk_pool:
+            for job in jobs:
+                report(batch_transcribe_file(*job, chunk_pool=chunk_pool, chunk_seconds=args.chunk_minutes * 60,
+                                             use_cache=use_cache))
+    elif workers == 1:
+        for batch in clip_batches:
+            for result in batch_transcribe_clips(batch, lang, args.model, use_cache):
+                report(result)
+        for job in jobs:
+            report(batch_transcribe_file(*job, use_cache=use_cache))
+    else:
+        with make_worker_pool(workers, pool_model(lang, args.model)) as executor:
+            clip_futures = {executor.submit(batch_transcribe_clips, batch, lang, args.model, use_cache): batch
+                            for batch in clip_batches}
+            futures = list(clip_futures) + [executor.submit(batch_transcribe_file, *job, use_cache=use_cache)
+                                            for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    try:
+                        if future in clip_futures:
+                            for result in future.result():
+                                report(result)
+                        else:
+                            report(future.result())
+                    except Exception as e:
+                        lost = len(clip_futures.get(future, [None]))
+                        failed += lost
+                        done += lost
+                        print(f"[{done}/{total}] FAIL worker crashed: {str(e)}")
+            except KeyboardInterrupt:
+                print("Interrupted, cancelling remaining files")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    elapsed = time.perf_counter() - started
+    print(f"Finished: {total - failed} succeeded, {failed} failed in {elapsed:.1f}s"
+          f" ({total / max(elapsed, 1e-9) * 60:.1f} files per minute)")
+    return 1 if failed else 0
+
+
+WATCH_SETTLE_SECONDS = 5.0
+WATCH_POLL_SECONDS = 2.0
+WATCH_MAX_ATTEMPTS = 3
+
+
+class InotifyWatcher:
+    """Changed files in the watched folders from Linux inotify, called through ctypes"""
+
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    EVENT_HEADER = "iIII"
+
+    def __init__(self, roots, recursive=False):
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+        self.recursive = recursive
+        self.folders = {}
+        try:
+            for root in roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, folder):
+        folders = [folder]
+        if self.recursive:
+            folders += [os.path.join(root_dir, name) for root_dir, dirs, _ in os.walk(folder) for name in dirs]
+        for path in folders:
+            mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+            if wd < 0:
+                errno = self._ctypes.get_errno()
+                raise OSError(errno, f"Cannot watch {path}: {os.strerror(errno)}")
+            self.folders[wd] = path
+
+    def wait(self, timeout):
+        """Files changed since the last call, or None when everything has to be scanned again"""
+        import select
+        import struct
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        header = struct.calcsize(self.EVENT_HEADER)
+        changed = set()
+        rescan = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = struct.unpack_from(self.EVENT_HEADER, data, offset)
+            name = data[offset + header:offset + header + length].rstrip(b"\0")
+            offset += header + length
+            if mask & self.IN_Q_OVERFLOW:
+                rescan = True
+            elif mask & self.IN_IGNORED:
+                self.folders.pop(wd, None)
+            elif wd in self.folders and name:
+                path = os.path.join(self.folders[wd], os.fsdecode(name))
+                if not mask & self.IN_ISDIR:
+                    changed.add(path)
+                elif self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # A folder moved in may already hold files that never raised an event of their own
+                    self._add_tree(path)
+                    rescan = True
+        return None if rescan else changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback where inotify isn't available (Windows, macOS, network shares): rescan after every interval"""
+
+    def __init__(self, poll_seconds=WATCH_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+
+    def wait(self, timeout):
+        time.sleep(self.poll_seconds if timeout is None else min(timeout, self.poll_seconds))
+        return None
+
+    def close(self):
+        pass
+
+
+class WatchState:
+    """Files the watch mode has handled, saved after every file so that a restart never redoes one"""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.files = json.load(f)
+            except Exception as e:
+                print(f"Error reading watch state {path}: {str(e)}")
+
+    @staticmethod
+    def key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path, stat):
+        """The entry of this file, unless it was replaced by a different file of the same name since"""
+        entry = self.files.get(self.key(file_path))
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def is_processed(self, file_path, stat):
+        """Handled before; a failed file counts as handled only after WATCH_MAX_ATTEMPTS tries"""
+        entry = self.get(file_path, stat)
+        if entry is None:
+            return False
+        return entry["status"] != "failed" or entry.get("attempts", 1) >= WATCH_MAX_ATTEMPTS
+
+    def mark(self, file_path, stat, status, output_srt=None, error=None):
+        previous = self.get(file_path, stat)
+        attempts = previous.get("attempts", 1) + 1 if previous and previous["status"] == "failed" else 1
+        self.files[self.key(file_path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "status": status,
+                                           "attempts": attempts, "srt": output_srt and os.path.abspath(output_srt),
+                                           "error": error, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.files, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error writing watch state: {str(e)}")
+
+
+def is_inside(path, folder):
+    try:
+        return os.path.normcase(os.path.commonpath([path, folder])) == os.path.normcase(folder)
+    except ValueError:
+        # Paths on different drives
+        return False
+
+
+def watch_output_path(file_path, roots, output_dir=None):
+    """Output path of a watched file; with an output folder the folder tree below the watched folder is mirrored"""
+    if not output_dir:
+        return default_output_path(file_path)
+    file_path = os.path.abspath(file_path)
+    roots = [os.path.abspath(root) for root in roots]
+    root = max((root for root in roots if is_inside(file_path, root)), key=len,
+               default=os.path.dirname(file_path))
+    rel_dir = os.path.relpath(os.path.dirname(file_path), root)
+    # Several watched folders each get their own subfolder so equally named files don't collide
+    prefix = os.path.basename(root) if len(roots) > 1 else ""
+    return default_output_path(file_path, os.path.normpath(os.path.join(output_dir, prefix, rel_dir)))
+
+
+def run_watch(args):
+    run_startup_checks()
+    if app_state.show_ffmpeg_error:
+        print("ffmpeg was not found. This application requires ffmpeg to work properly.")
+        return 2
+    roots = [os.path.abspath(item) for item in args.inputs]
+    missing = [root for root in roots if not os.path.isdir(root)]
+    if missing:
+        print(f"Not a folder: {', '.join(missing)}")
+        return 2
+
+    if args.watch_state:
+        state_path = args.watch_state
+    else:
+        key = "|".join(roots + [os.path.abspath(args.output_dir or "")])
+        state_path = os.path.join(app_cache_dir("watch"),
+                                  hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+    state = WatchState(state_path)
+    lang = None if args.language == "auto" else args.language
+    rules = GroupingRules(args.words_per_line, args.max_chars, args.max_duration, args.split_gap)
+
+    watcher = None
+    if not args.poll and sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(roots, recursive=args.recursive)
+            print("Watching with inotify")
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available ({str(e)}), polling instead")
+    if watcher is None:
+        watcher = PollingWatcher(args.poll_seconds)
+        print(f"Watching by polling every {args.poll_seconds:g}s")
+
+    # Warm the model up once, every file after that is transcribed with the same loaded model; auto files are
+    # routed by the pre-pass, so which model they need is only known file by file. With --long-file the workers
+    # do all the inference and hold the model themselves
+    if pool_model(lang, args.model) and not args.long_file:
+        model_registry.get(args.model)
+    chunk_pool = make_worker_pool(max(1, args.workers), pool_model(lang, args.model)) if args.long_file else None
+    print(f"Watching {', '.join(roots)} (state: {state_path}), press Ctrl+C to stop")
+
+    waiting = {}
+    changed = None
+    try:
+        while True:
+            if changed is None:
+                candidates = [os.path.abspath(path) for path, _ in collect_media_files(roots, args.recursive)]
+            else:
+                candidates = [path for path in changed if is_supported_file(path)]
+            for path in candidates:
+                waiting.setdefault(path, None)
+
+            # A file is only picked up once its size and mtime have stayed the same for settle_seconds
+            now = time.monotonic()
+            ready = []
+            for path, seen in list(waiting.items()):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    del waiting[path]
+                    continue
+                if state.is_processed(path, stat):
+                    del waiting[path]
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if seen is None or seen[0] != signature or not stat.st_size:
+                    waiting[path] = (signature, now)
+                elif now - seen[1] >= args.settle_seconds:
+                    ready.append((path, stat))
+                    del waiting[path]
+
+            for path, stat in sorted(ready):
+                output_srt = watch_output_path(path, roots, args.output_dir)
+                if args.skip_existing and os.path.exists(output_srt):
+                    print(f"SKIP {path} (already exists: {output_srt})")
+                    state.mark(path, stat, "skipped", output_srt)
+                    continue
+                _, _, error, elapsed = batch_transcribe_file(path, output_srt, lang, args.model, rules, chunk_pool,
+                                                             args.chunk_minutes * 60, not args.no_cache)
+                if error:
+                    print(f"FAIL {path} ({elapsed:.1f}s): {error}")
+                else:
+                    print(f"OK   {path} -> {output_srt} ({elapsed:.1f}s)")
+                state.mark(path, stat, "failed" if error else "done", output_srt, error)
+                if not state.is_processed(path, stat):
+                    # Tried again once it has settled; inotify won't report the unchanged file a second time
+                    waiting[path] = None
+
+            changed = watcher.wait(args.poll_seconds if waiting else None)
+    except KeyboardInterrupt:
+        print("Stopping watch mode")
+    finally:
+        watcher.close()
+        if chunk_pool is not None:
+            chunk_pool.shutdown(cancel_futures=True)
+    return 0
+
+
+SERVER_HISTORY_LIMIT = 500
+SERVER_CHUNK_SIZE = 1024 * 1024
+
+
+def job_info(job, scheduler):
+    info = {
+        "id": job.id,
+        "status": job.status,
+        "file": os.path.basename(job.video_path),
+        "model": job.model_type,
+        "language": job.lang,
+        **GroupingRules.of(job.group_size).as_dict(),
+        "error": job.error,
+        "submitted_at": job.submitted_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "processed_seconds": job.progress_seconds,
+        "total_seconds": job.total_seconds,
+        "progress": round(job.progress_fraction(), 4),
+        "eta_seconds": job.eta_seconds(),
+        "telemetry": job.telemetry.record(job.status),
+    }
+    if job.status == "pending":
+        info["queue_position"] = scheduler.position(job)
+    return info
+
+
+def srt_text(words, group_size):
+    """Render grouped words as SRT text in memory"""
+    table = WordTable.from_words(words)
+    return "".join(srt_cues(table, group_bounds(table, group_size)))
+
+
+class TranscriptionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scheduler, upload_dir, max_upload_bytes, allow_remote_paths=False):
+        super().__init__(address, TranscriptionRequestHandler)
+        self.scheduler = scheduler
+        self.upload_dir = upload_dir
+        self.max_upload_bytes = max_upload_bytes
+        self.allow_remote_paths = allow_remote_paths
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET    /health                      server and queue state
+    POST   /jobs                        JSON {"path": ...} (loopback clients or --allow-remote-paths only)
+                                        or the raw media file as body (?filename=clip.mp4)
+                                        options: model, language, words_per_line, max_chars, max_duration,
+                                        split_gap (JSON fields or query string)
+    GET    /jobs/<id>                   job status
+    GET    /jobs/<id>/result?format=    srt (default) or json with word timings
+    DELETE /jobs/<id>                   cancel
+    """
+
+    server_version = "SRTing"
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} - {format % args}")
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self):
+        parsed = urllib.parse.urlparse(self.path)
+        parts = [part for part in parsed.path.split("/") if part]
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(parsed.query).items()}
+        return parts, query
+
+    def may_read_paths(self):
+        """Server-side paths are only taken from this machine unless --allow-remote-paths is set"""
+        if self.server.allow_remote_paths:
+            return True
+        try:
+            return ipaddress.ip_address(self.client_address[0]).is_loopback
+        except ValueError:
+            return False
+
+    def find_job(self, parts):
+        try:
+            job = self.server.scheduler.get(int(parts[1]))
+        except ValueError:
+            job = None
+        if job is None:
+            self.send_json(404, {"error": "Unknown job"})
+        return job
+
+    def do_GET(self):
+        parts, query = self.route()
+        scheduler = self.server.scheduler
+        if parts == ["health"]:
+            self.send_json(200, {"status": "ok", "pending": scheduler.count("pending"),
+                                 "running": scheduler.count("running"),
+                                 "loaded_models": model_registry.loaded_models()})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.find_job(parts)
+            if job:
+                self.send_json(200, job_info(job, scheduler))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self.find_job(parts)
+            if not job:
+                return
+            if job.status != "done":
+                self.send_json(409, {"error": f"Job is {job.status}", "status": job.status, "detail": job.error})
+            elif query.get("format", "srt") == "json":
+                self.send_json(200, {"id": job.id, "language": job.lang, "words": job.words.to_words()})
+            else:
+                body = srt_text(job.words, job.group_size).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-subrip; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_DELETE(self):
+        parts, _ = self.route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.find_job(parts)
+            if job:
+                # A running job removes its upload when it stops; a pending one never runs, so it is removed here
+                if self.server.scheduler.cancel(job.id) and job.status == "cancelled":
+                    remove_upload(job)
+                self.send_json(200, job_info(job, self.server.scheduler))
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        parts, query = self.route()
+        if parts != ["jobs"]:
+            self.send_json(404, {"error": "Not found"})
+            return
+        scheduler = self.server.scheduler
+        length = int(self.headers.get("Content-Length") or 0)
+        upload_path = None
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("The JSON body must be an object")
+                if not self.may_read_paths():
+                    self.send_json(403, {"error": "Server-side paths are only accepted from this machine, "
+                                                  "upload the file instead"})
+                    return
+                options = dict(query, **body)
+                video_path = options.get("path")
+                if not isinstance(video_path, str) or not os.path.isfile(video_path):
+                    self.send_json(400, {"error": f"File not found: {video_path}"})
+                    return
+                if not is_supported_file(video_path):
+                    self.send_json(400, {"error": f"Unsupported file type: {video_path}"})
+                    return
+            else:
+                options = query
+                filename = os.path.basename(options.get("filename", ""))
+                if not filename or not is_supported_file(filename):
+                    self.send_json(400, {"error": "Pass ?filename= with a supported media extension"})
+                    return
+                if length <= 0 or length > self.server.max_upload_bytes:
+                    self.send_json(413, {"error": f"Upload must be between 1 byte and "
+                                                  f"{self.server.max_upload_bytes // 1024 // 1024} MB"})
+                    return
+                if scheduler.count("pending") >= scheduler.max_pending:
+                    raise QueueFull("Queue is full")
+                upload_path = os.path.join(self.server.upload_dir, f"{time.time_ns()}-{filename}")
+                with open(upload_path, "wb") as f:
+                    remaining = length
+                    while remaining:
+                        block = self.rfile.read(min(SERVER_CHUNK_SIZE, remaining))
+                        if not block:
+                            raise ValueError("Upload ended early")
+                        f.write(block)
+                        remaining -= len(block)
+                video_path = upload_path
+
+            model_type = options.get("model", "base")
+            lang = options.get("language") or None
+            if model_type not in MODEL_OPTIONS.values():
+                raise ValueError(f"Unknown model: {model_type}")
+            if lang == "auto":
+                lang = None
+            if lang is not None and lang not in LANGUAGES.values():
+                raise ValueError(f"Unknown language: {lang}")
+            rules = GroupingRules(max(1, int(options.get("words_per_line", 1))),
+                                  optional_number(options.get("max_chars"), int),
+                                  optional_number(options.get("max_duration")),
+                                  optional_number(options.get("split_gap")))
+
+            job = TranscriptionJob(video_path, None, lang, model_type, rules)
+            job.upload_path = upload_path
+            scheduler.submit(job)
+            upload_path = None
+            for dropped in scheduler.prune(SERVER_HISTORY_LIMIT):
+                remove_upload(dropped)
+            self.send_json(202, dict(job_info(job, scheduler), status_url=f"/jobs/{job.id}",
+                                     result_url=f"/jobs/{job.id}/result"))
+        except QueueFull as e:
+            self.send_json(503, {"error": str(e)}, headers={"Retry-After": "5"})
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+        finally:
+            if upload_path and os.path.exists(upload_path):
+                os.remove(upload_path)
+
+
+def optional_number(value, kind=float):
+    return kind(value) if value not in (None, "") else None
+
+
+def run_server_job(job):
+    try:
+        # Finished jobs are kept for a while; columns take a fraction of the memory of the word dicts
+        job.words = WordTable.from_words(transcribe_words(
+            job.video_path, job.lang, job.model_type, cancel_event=job.cancel_event, telemetry=job.telemetry,
+            on_words=lambda words, processed, total: job.set_progress(processed, total)))
+        job.telemetry.write()
+    finally:
+        remove_upload(job)
+
+
+def remove_upload(job):
+    try:
+        if getattr(job, "upload_path", None) and os.path.exists(job.upload_path):
+            os.remove(job.upload_path)
+    except OSError as e:
+        print(f"Error removing upload {job.upload_path}: {str(e)}")
+
+
+def run_server(args):
+    run_startup_checks()
+    if app_state.show_ffmpeg_error:
+        print("ffmpeg was not found. This application requires ffmpeg to work properly.")
+        return 2
+
+    scheduler = JobScheduler(run_server_job, max_concurrent=args.server_jobs, max_pending=args.queue_size)
+    for model_type in args.preload:
+        model_registry.preload(model_type)
+
+    upload_dir = app_cache_dir("uploads")
+    server = TranscriptionServer((args.host, args.port), scheduler, upload_dir, args.max_upload_mb * 1024 * 1024,
+                                 allow_remote_paths=args.allow_remote_paths)
+    print(f"Serving on http://{args.host}:{server.server_port} "
+          f"({args.server_jobs} parallel jobs, up to {args.queue_size} queued)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down server")
+    finally:
+        server.server_close()
+    return 0
+
+
+def server_request(method, url, data=None, headers=None):
+    request = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def remote_transcribe_file(server_url, video_path, output_srt, lang, model_type, group_size, poll_seconds=2.0):
+    """Upload a file to a running server, wait for the job and save its SRT; same result shape as batch_transcribe_file"""
+    started = time.perf_counter()
+    try:
+        options = {key: value for key, value in GroupingRules.of(group_size).as_dict().items() if value is not None}
+        query = urllib.parse.urlencode(dict(options, filename=os.path.basename(video_path), model=model_type,
+                                            language=lang or "auto"))
+        while True:
+            try:
+                with open(video_path, "rb") as f:
+                    job = json.loads(server_request(
+                        "POST", f"{server_url}/jobs?{query}", data=f,
+                        headers={"Content-Type": "application/octet-stream",
+                                 "Content-Length": str(os.path.getsize(video_path))}))
+                break
+            except urllib.error.HTTPError as e:
+                if e.code != 503:
+                    raise RuntimeError(f"Server refused the file: {e.read().decode(errors='replace')}") from e
+                time.sleep(float(e.headers.get("Retry-After") or 5))
+
+        while job["status"] in ("pending", "running"):
+            time.sleep(poll_seconds)
+            job = json.loads(server_request("GET", f"{server_url}/jobs/{job['id']}"))
+        if job["status"] != "done":
+            raise RuntimeError(f"Job {job['status']}: {job.get('error')}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_srt)), exist_ok=True)
+        with open(output_srt, "wb") as f:
+            f.write(server_request("GET", f"{server_url}/jobs/{job['id']}/result?format=srt"))
+        return video_path, output_srt, None, time.perf_counter() - started
+    except Exception as e:
+        return video_path, output_srt, f"{type(e).__name__}: {str(e)}", time.perf_counter() - started
+
+
+BENCHMARK_TOLERANCE = 0.10
+BENCHMARK_MIN_SECONDS = 0.01
+
+
+class StubModel:
+    """Stands in for a Whisper model in benchmarks: no weights, one fake word every 0.4 seconds"""
+
+    def __init__(self, model_type):
+        self.model_type = model_type
+
+    def transcribe(self, audio, language=None):
+        import numpy as np
+
+        duration = len(audio) / SAMPLE_RATE
+        # Touch every sample once so the run still costs something proportional to the audio
+        level = float(np.abs(audio).mean()) if len(audio) else 0.0
+        words = [{"text": f"word{index}", "start": start, "end": start + 0.3, "confidence": level}
+                 for index, start in enumerate(np.arange(0.0, max(0.0, duration - 0.3), 0.4).tolist())]
+        return {"language": language or "en", "segments": [{"words": words}]}
+
+
+class StubBackend:
+    """Stands in for WhisperBackend in benchmarks: StubModels, transcribed without any inference"""
+
+    def load(self, model_type):
+        return StubModel(model_type)
+
+    def model_size(self, model):
+        return 0
+
+    def transcribe(self, model, audio, lang, initial_prompt=None):
+        return model.transcribe(audio, language=lang)
+
+    def transcribe_batch(self, model, clips, lang):
+        return [transcribe_span(model, audio, lang) for audio in clips]
+
+    def detect_language(self, model, audio):
+        return {}
+
+    @contextmanager
+    def cancellable(self, model, cancel_event):
+        yield
+
+
+def make_synthetic_audio(path, seconds, seed=0):
+    """Write a speech-like WAV: voiced harmonics in syllable bursts, separated by short pauses"""
+    import numpy as np
+    import wave
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(harmonic * phase) / harmonic for harmonic in range(1, 6))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    pauses = (np.sin(2 * np.pi * 0.2 * t) > -0.7).astype(np.float32)
+    audio = 0.3 * voice * syllables * pauses + 0.01 * rng.standard_normal(len(t))
+    samples = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+def measure_cold_start():
+    import subprocess
+
+    started = time.perf_counter()
+    try:
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-check"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=120)
+    except Exception as e:
+        return {"error": str(e)}
+    wall = time.perf_counter() - started
+    for line in completed.stdout.splitlines():
+        if line.startswith("Window shown after "):
+            return {"cold_start_seconds": float(line.split()[3].rstrip("s")), "cold_start_process_seconds": wall}
+    return {"error": f"GUI did not start (exit code {completed.returncode})"}
+
+
+def benchmark_srt_write(word_count, group_size, folder):
+    import numpy as np
+
+    starts = np.arange(word_count) * 0.4
+    words = [{"text": f" word{index}", "start": start, "end": start + 0.3}
+             for index, start in enumerate(starts.tolist())]
+    started = time.perf_counter()
+    write_srt(words, os.path.join(folder, "benchmark.srt"), group_size)
+    elapsed = time.perf_counter() - started
+    return {"srt_words": word_count, "srt_write_seconds": elapsed, "srt_words_per_second": word_count / elapsed}
+
+
+def benchmark_clip_batch(model_type, clip_paths, lang, batch_size):
+    """Clips per minute transcribed one by one against batch_size at a time, on the same loaded model"""
+    audios = [decode_audio(path) for path in clip_paths]
+    started = time.perf_counter()
+    sequential = [transcribe_words(path, lang, model_type, use_cache=False) for path in clip_paths]
+    sequential_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    batched = []
+    with model_registry.use(model_type) as model:
+        for start in range(0, len(audios), batch_size):
+            batched += [words for words, _ in transcribe_clip_batch(model, audios[start:start + batch_size], lang)]
+    batched_seconds = time.perf_counter() - started
+    return {
+        "clips": len(clip_paths),
+        "batch_size": batch_size,
+        "sequential_seconds": sequential_seconds,
+        "batched_seconds": batched_seconds,
+        "sequential_clips_per_minute": len(clip_paths) / sequential_seconds * 60,
+        "batched_clips_per_minute": len(clip_paths) / batched_seconds * 60,
+        "speedup": sequential_seconds / batched_seconds,
+        "word_error_rate": word_error_rate([word for words in sequential for word in words.to_words()],
+                                           [word for words in batched for word in words]),
+    }
+
+
+def flatten_benchmark(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten_benchmark(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare_benchmarks(current, previous, tolerance=BENCHMARK_TOLERANCE):
+    """Print metric changes against an earlier results file; returns the metrics that got worse than tolerance"""
+    now = flatten_benchmark(current["results"])
+    before = flatten_benchmark(previous["results"])
+    regressions = []
+    for name in sorted(set(now) & set(before)):
+        if not before[name]:
+            continue
+        change = (now[name] - before[name]) / before[name]
+        higher_is_better = name.endswith(("_per_second", "_per_minute"))
+        worse = -change if higher_is_better else change
+        # Sub-10ms timings are mostly noise, don't call them regressions
+        noise = name.endswith("_seconds") and abs(now[name] - before[name]) < BENCHMARK_MIN_SECONDS
+        if name.endswith(("_seconds", "_rtf", "_mb", "_per_second", "_per_minute")) and worse > tolerance and not noise:
+            regressions.append(name)
+            flag = "  <-- regression"
+        else:
+            flag = ""
+        print(f"{name:55} {before[name]:12.4f} -> {now[name]:12.4f} ({change:+.1%}){flag}")
+    return regressions
+
+
+def transcript_tokens(words):
+    tokens = (re.sub(r"[^\w']+", "", word["text"].lower()) for word in words)
+    return [token for token in tokens if token]
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance of hypothesis from reference, relative to the number of reference words"""
+    reference = transcript_tokens(reference)
+    hypothesis = transcript_tokens(hypothesis)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for row, expected in enumerate(reference, start=1):
+        current = [row]
+        for column, heard in enumerate(hypothesis, start=1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (expected != heard)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def run_benchmark(args):
+    global LANGUAGE_PREPASS_ENABLED
+    import platform
+    import tempfile
+
+    run_startup_checks()
+    # Every model is measured as itself: no pre-pass inside the timed runs and no routing to English-only models,
+    # which would also make the one by one and the batched clip runs use different models
+    LANGUAGE_PREPASS_ENABLED = False
+    if args.stub_model:
+        model_registry.backend = StubBackend()
+
+    # Quantized models are measured against their full precision model, so that one has to run as well
+    bench_models = []
+    for model_type in args.bench_models:
+        if model_type.endswith(QUANTIZED_SUFFIX) and model_type[:-len(QUANTIZED_SUFFIX)] not in bench_models:
+            bench_models.append(model_type[:-len(QUANTIZED_SUFFIX)])
+        if model_type not in bench_models:
+            bench_models.append(model_type)
+
+    results = {}
+    model_words = {}
+    with tempfile.TemporaryDirectory() as folder:
+        if args.bench_audio:
+            audio_path = args.bench_audio
+        else:
+            audio_path = make_synthetic_audio(os.path.join(folder, "synthetic.wav"), args.bench_seconds)
+
+        # The cold decode recreates the entry of a user supplied file, which was in the cache before and stays there
+        cache_path = pcm_cache_path(audio_path)
+        keep_cache = [cache_path] if args.bench_audio and os.path.exists(cache_path) else []
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        started = time.perf_counter()
+        duration = len(decode_audio(audio_path)) / SAMPLE_RATE
+        cold_decode = time.perf_counter() - started
+        started = time.perf_counter()
+        decode_audio(audio_path)
+        results["decode"] = {"audio_seconds": duration, "cold_seconds": cold_decode,
+                             "cached_seconds": time.perf_counter() - started}
+        clip_paths = [make_synthetic_audio(os.path.join(folder, f"clip{index}.wav"), args.bench_clip_seconds, index)
+                      for index in range(args.bench_clips)]
+
+        for model_type in bench_models:
+            model_registry.clear()
+            print(f"Benchmarking model: {model_type}")
+            # Sampled around this model only; the process peak would carry over from the models measured before
+            with RssSampler() as memory:
+                started = time.perf_counter()
+                model_registry.get(model_type)
+                load_seconds = time.perf_counter() - started
+                # A first load converts the model on a thread; the write would slow down the timed transcription
+                wait_for_conversions()
+                telemetry = JobTelemetry(audio_path, model_type)
+                started = time.perf_counter()
+                words = transcribe_words(audio_path, args.language if args.language != "auto" else None, model_type,
+                                         use_cache=False, telemetry=telemetry)
+                transcribe_seconds = time.perf_counter() - started
+            results[f"model_{model_type}"] = {
+                "model_used": telemetry.model_type,
+                "load_seconds": load_seconds,
+                "transcribe_seconds": transcribe_seconds,
+                "transcribe_rtf": transcribe_seconds / duration,
+                "words": len(words),
+                "peak_rss_mb": memory.peak,
+            }
+            model_words[model_type] = words.to_words()
+            if model_type.endswith(QUANTIZED_SUFFIX):
+                reference = model_type[:-len(QUANTIZED_SUFFIX)]
+                results[f"model_{model_type}"].update({
+                    "word_error_rate": word_error_rate(model_words[reference], model_words[model_type]),
+                    "speedup": results[f"model_{reference}"]["transcribe_seconds"] / transcribe_seconds,
+                })
+            if clip_paths:
+                print(f"Benchmarking {len(clip_paths)} clips one by one and batched with model: {model_type}")
+                results[f"clips_{model_type}"] = benchmark_clip_batch(
+                    model_type, clip_paths, args.language if args.language != "auto" else None,
+                    args.clip_batch if args.clip_batch > 1 else CLIP_BATCH_SIZE)
+        model_registry.clear()
+        for path in [audio_path] + clip_paths:
+            cache_path = pcm_cache_path(path)
+            if cache_path not in keep_cache and os.path.exists(cache_path):
+                os.remove(cache_path)
+
+        results["srt_write"] = benchmark_srt_write(args.bench_words, args.words_per_line, folder)
+
+    if not args.skip_cold_start:
+        results["startup"] = measure_cold_start()
+    results["process_peak_rss_mb"] = peak_rss_mb()
+
+    try:
+        import torch
+        torch_version = torch.__version__
+    except Exception:
+        torch_version = None
+    report = {
+        "meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(), "torch": torch_version,
+                 "stub_model": args.stub_model, "audio": args.bench_audio or "synthetic", "language_prepass": False,
+                 "audio_seconds": duration, "intra_op_threads": TORCH_INTRA_OP_THREADS or None,
+                 "inter_op_threads": TORCH_INTER_OP_THREADS or None},
+        "results": results,
+    }
+    with open(args.bench_output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Benchmark results saved to: {args.bench_output}")
+
+    if args.bench_compare:
+        with open(args.bench_compare, "r", encoding="utf-8") as f:
+            regressions = compare_benchmarks(report, json.load(f), args.bench_tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.bench_tolerance:.0%}")
+            return 1
+    return 0
+
+
 def browse_file():
     try:
         file_path = filedialog.askopenfilename(filetypes=[("Multimedia files", "*.mp4 *.mp3 *.avi *.wav *.mov")])
@@ -351,169 +3279,620 @@ def update_ui_texts():
         lang_label.config(text=current_ui_lang["select_lang"])
         model_label.config(text=current_ui_lang["select_model"])
         group_label.config(text=current_ui_lang["select_grouping"])
+        max_chars_label.config(text=current_ui_lang["max_chars"])
+        max_duration_label.config(text=current_ui_lang["max_duration"])
+        split_gap_label.config(text=current_ui_lang["split_gap"])
+        long_file_check.config(text=current_ui_lang["long_file"])
         generate_button.config(text=current_ui_lang["generate"])
+        queue_label.config(text=current_ui_lang["queue"])
+        queue_tree.heading("file", text=current_ui_lang["queue_file"])
+        queue_tree.heading("model", text=current_ui_lang["queue_model"])
+        queue_tree.heading("status", text=current_ui_lang["queue_status"])
+        queue_tree.heading("progress", text=current_ui_lang["queue_progress"])
+        latest_cues_label.config(text=current_ui_lang["latest_cues"])
+        cancel_button.config(text=current_ui_lang["cancel"])
+        parallel_label.config(text=current_ui_lang["parallel_jobs"])
+        for job in job_scheduler.jobs:
+            refresh_job(job)
     except Exception as e:
         print(f"Error updating UI texts: {str(e)}")
 
 
+def on_model_selected(event):
+    try:
+        model_display = model_combobox.get()
+        if model_display in MODEL_OPTIONS:
+            model_registry.preload(MODEL_OPTIONS[model_display])
+    except Exception as e:
+        print(f"Error preloading model: {str(e)}")
+
+
+long_file_pool = None
+
+
+def get_long_file_pool(model_type):
+    """Worker pool for long file mode, created on first use and kept so the workers' models stay loaded"""
+    global long_file_pool
+    if long_file_pool is None:
+        long_file_pool = make_worker_pool(LONG_FILE_WORKERS, model_type)
+    return long_file_pool
+
+
+job_scheduler = None
+_reported_jobs = set()
+
+
+def run_gui_job(job):
+    app_state.startup_ready.wait()
+    lang, model_type = job.lang, job.model_type
+    chunk_pool = None
+    if job.long_file:
+        # Routed first, so a new pool preloads the model this job will really use
+        lang, model_type = resolve_language(job.video_path, lang, model_type, job.telemetry)
+        chunk_pool = get_long_file_pool(model_type)
+    print(f"Starting transcription with model: {model_type}, language: {lang}, grouping: {GroupingRules.of(job.group_size).as_dict()}")
+    try:
+        transcribe_word_by_word(job.video_path, job.output_srt, lang, model_type, job.group_size, chunk_pool,
+                                cancel_event=job.cancel_event, telemetry=job.telemetry,
+                                on_progress=lambda *progress: on_job_progress(job, *progress))
+    except JobCancelled:
+        raise
+    except Exception as e:
+        error_log_path = os.path.join(os.path.dirname(job.video_path), "error_log.txt")
+        with open(error_log_path, "w", encoding="utf-8") as f:
+            f.write(f"Error: {str(e)}\n")
+            traceback.print_exc(file=f)
+        raise
+
+
+def on_job_change(job):
+    root.after(0, lambda: refresh_job(job))
+
+
+def on_job_progress(job, processed_seconds, total_seconds, latest_cues):
+    job.set_progress(processed_seconds, total_seconds, latest_cues)
+    on_job_change(job)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def job_progress_text(job):
+    if job.status != "running" or not job.total_seconds:
+        return ""
+    text = f"{job.progress_fraction() * 100:.0f}%"
+    eta = job.eta_seconds()
+    if eta is not None:
+        text += f" {current_ui_lang['eta']} {format_duration(eta)}"
+    return text
+
+
+def show_latest_cues(cues):
+    latest_cues_text.config(state="normal")
+    latest_cues_text.delete("1.0", "end")
+    latest_cues_text.insert("end", "".join(cues).strip())
+    latest_cues_text.see("end")
+    latest_cues_text.config(state="disabled")
+
+
+def refresh_job(job):
+    try:
+        values = (os.path.basename(job.video_path), job.model_type, current_ui_lang[job.status],
+                  job_progress_text(job))
+        iid = str(job.id)
+        if queue_tree.exists(iid):
+            queue_tree.item(iid, values=values)
+        else:
+            queue_tree.insert("", "end", iid=iid, values=values)
+
+        # The bar follows processed audio of all running jobs together
+        running = [other for other in job_scheduler.jobs if other.status == "running"]
+        total_seconds = sum(other.total_seconds or 0.0 for other in running)
+        processed_seconds = sum(other.progress_seconds for other in running if other.total_seconds)
+        progress["value"] = 100.0 * processed_seconds / total_seconds if total_seconds else 0.0
+        if job.status == "running" and job.latest_cues:
+            show_latest_cues(job.latest_cues)
+
+        if job.finished and job_scheduler.idle():
+            report_finished_jobs()
+    except Exception as e:
+        print(f"Error updating job queue: {str(e)}")
+
+
+def report_finished_jobs():
+    finished = [job for job in job_scheduler.jobs if job.finished and job.id not in _reported_jobs]
+    _reported_jobs.update(job.id for job in finished)
+    done = [job for job in finished if job.status == "done"]
+    failed = [job for job in finished if job.status == "failed"]
+    if failed:
+        error_log_paths = "\n".join(sorted({os.path.join(os.path.dirname(job.video_path), "error_log.txt")
+                                            for job in failed}))
+        messagebox.showerror(current_ui_lang["error"],
+                             f"{current_ui_lang['error_log']}\nError log saved at: {error_log_paths}")
+    elif len(done) == 1:
+        messagebox.showinfo(current_ui_lang["done"], f"{current_ui_lang['saved_as']}\n{done[0].output_srt}\n\n"
+                                                     f"{timing_report(done[0].telemetry)}")
+    elif done:
+        slowest = max(done, key=lambda job: job.telemetry.total_seconds())
+        messagebox.showinfo(current_ui_lang["done"],
+                            f"{current_ui_lang['all_done'].format(count=len(done))}\n\n"
+                            f"{current_ui_lang['slowest']} {os.path.basename(slowest.video_path)}\n"
+                            f"{timing_report(slowest.telemetry)}")
+
+
+def timing_report(telemetry):
+    lines = [f"{stage['stage']}: {stage['wall_seconds']:.2f}s "
+             f"(CPU {stage['cpu_seconds'] + stage['worker_cpu_seconds']:.2f}s)" for stage in telemetry.stages]
+    lines.append(f"{current_ui_lang['total']}: {telemetry.total_seconds():.1f}s")
+    rtf = telemetry.realtime_factor()
+    if rtf is not None:
+        lines.append(f"{current_ui_lang['audio']}: {telemetry.audio_seconds:.1f}s, RTF {rtf:.2f}")
+    if telemetry.peak_rss_mb():
+        lines.append(f"{current_ui_lang['peak_memory']}: {telemetry.peak_rss_mb():.0f} MB")
+    return "\n".join(lines)
+
+
+def cancel_selected_jobs():
+    try:
+        for iid in queue_tree.selection():
+            job_scheduler.cancel(int(iid))
+    except Exception as e:
+        print(f"Error cancelling job: {str(e)}")
+
+
+def on_parallel_jobs_changed():
+    try:
+        job_scheduler.set_max_concurrent(parallel_jobs.get())
+    except Exception as e:
+        print(f"Error changing parallel jobs: {str(e)}")
+
+
 def run_transcription():
-    def task():
-        try:
-            file_path = selected_file.get()
-            if not file_path:
-                messagebox.showerror(current_ui_lang["error"], current_ui_lang["error_choose"])
-                root.after(0, progress.stop)
-                return
+    try:
+        file_path = selected_file.get()
+        if not file_path:
+            messagebox.showerror(current_ui_lang["error"], current_ui_lang["error_choose"])
+            return
+
+        if not is_supported_file(file_path):
+            messagebox.showerror("Error", "Unsupported file format.")
+            return
+
+        output_dir = output_folder.get()
+        lang_display = lang_combobox.get()
+        model_display = model_combobox.get()
+        # 0 in the limit spinboxes means no limit
+        group_size = GroupingRules(max(1, words_per_line.get()), max_chars.get() or None, max_duration.get() or None,
+                                   split_gap.get() or None)
+
+        if not lang_display in LANGUAGES or model_display not in MODEL_OPTIONS:
+            messagebox.showerror(current_ui_lang["error"], current_ui_lang["error_choose"])
+            return
+
+        lang = LANGUAGES.get(lang_display, None)
+        model_type = MODEL_OPTIONS[model_display]
+        output_srt = default_output_path(file_path, output_dir)
+        job_scheduler.submit(TranscriptionJob(file_path, output_srt, lang, model_type, group_size,
+                                              long_file=long_file_mode.get()))
+    except Exception as e:
+        print(f"Error queueing transcription: {str(e)}")
+        traceback.print_exc()
+        messagebox.showerror("Error", f"Unexpected error: {str(e)}")
 
-            if not any(file_path.lower().endswith(ext) for ext in SUPPORTED_FORMATS):
-                messagebox.showerror("Error", "Unsupported file format.")
-                root.after(0, progress.stop)
-                return
 
-            output_dir = output_folder.get()
-            lang_display = lang_combobox.get()
-            model_display = model_combobox.get()
-            group_size = max(1, words_per_line.get())
+STARTUP_BUDGET_SECONDS = float(os.environ.get("SRTING_STARTUP_BUDGET", "1.5"))
+
+
+def run_background_startup():
+    """Everything the window doesn't need to appear: assets, ffmpeg probe, diagnostics and warming up the ML imports"""
+    try:
+        run_startup_checks()
+        if app_state.show_ffmpeg_error:
+            root.after(0, lambda: messagebox.showerror(
+                "FFmpeg Missing", "ffmpeg was not found. This application requires ffmpeg to work properly."))
+        # Also imports torch and whisper_timestamped, so the first job doesn't pay for it
+        debug_pyinstaller_environment()
+    except Exception as e:
+        print(f"Error during background startup: {str(e)}")
+        traceback.print_exc()
+
+
+def on_window_shown(exit_after_startup=False):
+    elapsed = time.perf_counter() - _startup_started
+    within_budget = elapsed <= STARTUP_BUDGET_SECONDS
+    print(f"Window shown after {elapsed:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s)")
+    if not within_budget:
+        print(f"WARNING: Startup took longer than the {STARTUP_BUDGET_SECONDS:.2f}s budget")
+    if exit_after_startup:
+        root.destroy()
+        sys.exit(0 if within_budget else 1)
+    threading.Thread(target=run_background_startup, daemon=True).start()
 
-            if not lang_display in LANGUAGES or model_display not in MODEL_OPTIONS:
-                messagebox.showerror(current_ui_lang["error"], current_ui_lang["error_choose"])
-                root.after(0, progress.stop)
-                return
 
-            lang = LANGUAGES.get(lang_display, None)
-            model_type = MODEL_OPTIONS[model_display]
-            base_filename = os.path.splitext(os.path.basename(file_path))[0]
-            output_srt = os.path.join(output_dir if output_dir else os.path.dirname(file_path),
-                                      base_filename + "_subtitles.srt")
+def run_gui(exit_after_startup=False):
+    global root, selected_file, output_folder, words_per_line, long_file_mode, progress, generate_button
+    global max_chars, max_duration, split_gap, max_chars_label, max_duration_label, split_gap_label
+    global lang_ui_combobox, lang_combobox, model_combobox
+    global file_label, output_label, lang_label, model_label, group_label, long_file_check
+    global job_scheduler, queue_label, queue_tree, cancel_button, parallel_label, parallel_jobs
+    global latest_cues_label, latest_cues_text
 
-            print(f"Starting transcription with model: {model_type}, language: {lang}, group size: {group_size}")
+    try:
+        root = tk.Tk()
+
+        icon_path = resource_path(os.path.join("assets", "sygnetlogostrlogo1.png"))
+        if os.path.exists(icon_path):
             try:
-                transcribe_word_by_word(file_path, output_srt, lang, model_type, group_size)
-                root.after(0, lambda: messagebox.showinfo(current_ui_lang["done"],
-                                                          f"{current_ui_lang['saved_as']}\n{output_srt}"))
+                icon_image = Image.open(icon_path)
+                icon_photo = ImageTk.PhotoImage(icon_image)
+                root.iconphoto(False, icon_photo)
             except Exception as e:
-                error_log_path = os.path.join(os.path.dirname(file_path), "error_log.txt")
-                with open(error_log_path, "w", encoding="utf-8") as f:
-                    f.write(f"Error: {str(e)}\n")
-                    traceback.print_exc(file=f)
-                root.after(0, lambda: messagebox.showerror(
-                    current_ui_lang["error"],
-                    f"{current_ui_lang['error_log']}\nError log saved at: {error_log_path}"
-                ))
-        except Exception as e:
-            print(f"Error in transcription thread: {str(e)}")
-            traceback.print_exc()
-            root.after(0, lambda: messagebox.showerror("Error", f"Unexpected error: {str(e)}"))
-        finally:
-            root.after(0, progress.stop)
-
-    progress.start()
-    threading.Thread(target=task, daemon=True).start()
-
-
-try:
-    lang_ui_combobox = ttk.Combobox(frame, values=list(UI_LANGUAGES.keys()), state="readonly")
-    lang_ui_combobox.set("English")
-    lang_ui_combobox.grid(row=1, column=0, columnspan=3, sticky="e", pady=(0, 10))
-    lang_ui_combobox.bind("<<ComboboxSelected>>", change_language)
-
-    file_label = ttk.Label(frame)
-    file_label.grid(row=2, column=0, sticky="w")
-    file_entry = tk.Entry(frame, textvariable=selected_file, font=("Consolas", 10), bg="#1e1e1e", fg="white",
-                          relief="flat")
-    file_entry.grid(row=3, column=0, columnspan=2, sticky="ew", padx=(0, 10))
-    file_button = tk.Button(frame, text="...", command=browse_file, font=("Segoe UI", 10), bg="#7E57C2", fg="white",
-                            relief="flat")
-    file_button.grid(row=3, column=2, sticky="ew")
-
-    output_label = ttk.Label(frame)
-    output_label.grid(row=4, column=0, sticky="w", pady=(15, 5))
-    output_entry = tk.Entry(frame, textvariable=output_folder, font=("Consolas", 10), bg="#1e1e1e", fg="white",
-                            relief="flat")
-    output_entry.grid(row=5, column=0, columnspan=2, sticky="ew", padx=(0, 10))
-    output_button = tk.Button(frame, text="...", command=choose_output_folder, font=("Segoe UI", 10), bg="#7E57C2",
-                              fg="white", relief="flat")
-    output_button.grid(row=5, column=2, sticky="ew")
-
-    lang_label = ttk.Label(frame)
-    lang_label.grid(row=6, column=0, columnspan=3, sticky="w", pady=(20, 5))
-    lang_combobox = ttk.Combobox(frame, values=list(LANGUAGES.keys()), state="readonly")
-    lang_combobox.set("English")
-    lang_combobox.grid(row=7, column=0, columnspan=3, sticky="ew")
-
-    model_label = ttk.Label(frame)
-    model_label.grid(row=8, column=0, columnspan=3, sticky="w", pady=(15, 5))
-    model_combobox = ttk.Combobox(frame, values=list(MODEL_OPTIONS.keys()), state="readonly")
-    model_combobox.set("base - fast, medium quality")
-    model_combobox.grid(row=9, column=0, columnspan=3, sticky="ew")
-
-    group_label = ttk.Label(frame)
-    group_label.grid(row=10, column=0, columnspan=2, sticky="w", pady=(15, 5))
-    group_spinbox = tk.Spinbox(frame, from_=1, to=10, textvariable=words_per_line, width=5)
-    group_spinbox.grid(row=10, column=2, sticky="ew")
-
-
-    def on_enter(e):
-        generate_button.config(bg="#6A1B9A")
-
-
-    def on_leave(e):
-        generate_button.config(bg="#7E57C2")
-
-
-    generate_button = tk.Button(
-        frame,
-        text=current_ui_lang["generate"],
-        command=run_transcription,
-        font=("Segoe UI", 12, "bold"),
-        bg="#7E57C2",
-        fg="white",
-        relief="flat"
-    )
-    generate_button.grid(row=11, column=0, columnspan=3, sticky="ew", pady=(20, 10))
-    generate_button.bind("<Enter>", on_enter)
-    generate_button.bind("<Leave>", on_leave)
-
-    progress = ttk.Progressbar(frame, mode='indeterminate')
-    progress.grid(row=12, column=0, columnspan=3, sticky='ew', pady=(0, 10))
-
-    dc_icon_path = resource_path(os.path.join("assets", "dcblackicon.png"))
-    if os.path.exists(dc_icon_path):
-        def open_discord():
-            webbrowser.open("https://discord.com/users/eskimek")
+                print(f"Error setting application icon: {str(e)}")
+        root.title(current_ui_lang["title"])
+        root.geometry("560x990")
+        root.configure(bg="#121212")
+    except Exception as e:
+        print(f"Error initializing Tkinter: {str(e)}")
+        with open("tkinter_error.txt", "w") as f:
+            f.write(f"Error initializing Tkinter: {str(e)}\n")
+            traceback.print_exc(file=f)
+        sys.exit(1)
+
+    selected_file = tk.StringVar()
+    output_folder = tk.StringVar()
+    words_per_line = tk.IntVar(value=1)
+    max_chars = tk.IntVar(value=0)
+    max_duration = tk.DoubleVar(value=0.0)
+    split_gap = tk.DoubleVar(value=0.0)
+    long_file_mode = tk.BooleanVar(value=False)
+    parallel_jobs = tk.IntVar(value=1)
+    job_scheduler = JobScheduler(run_gui_job, max_concurrent=1, on_change=on_job_change)
 
+    try:
+        style = ttk.Style()
+        style.theme_use("clam")
+        style.configure("TFrame", background="#121212")
+        style.configure("TLabel", background="#121212", foreground="#D1C4E9", font=("Segoe UI", 11))
+        style.configure("TButton", font=("Segoe UI", 11, "bold"), padding=6)
+        style.configure("TCombobox", fieldbackground="#2c2c38", background="#2c2c38", foreground="white",
+                        font=("Segoe UI", 11))
+        style.map("TCombobox", fieldbackground=[("readonly", "#2c2c38")], foreground=[("readonly", "white")])
+
+        frame = ttk.Frame(root, padding=20)
+        frame.pack(fill="both", expand=True)
+    except Exception as e:
+        print(f"Error setting up Tkinter style: {str(e)}")
+        messagebox.showerror("Error", f"Error setting up UI: {str(e)}")
 
-        try:
-            dc_img = Image.open(dc_icon_path).resize((24, 24), Image.LANCZOS)
-            dc_photo = ImageTk.PhotoImage(dc_img)
-            dc_btn = tk.Button(frame, image=dc_photo, text=" discord: eskimek", compound="left", command=open_discord,
-                               font=("Segoe UI", 10), bg="#121212", fg="white", activebackground="#1e1e1e",
-                               bd=0, relief="flat", cursor="hand2")
-            dc_btn.image = dc_photo
-            dc_btn.grid(row=13, column=0, columnspan=3, pady=(10, 0))
-        except Exception as e:
-            print(f"Error loading Discord icon: {str(e)}")
-            dc_btn = tk.Button(frame, text="discord: eskimek", command=open_discord,
-                               font=("Segoe UI", 10), bg="#121212", fg="white",
-                               bd=0, relief="flat", cursor="hand2")
-            dc_btn.grid(row=13, column=0, columnspan=3, pady=(10, 0))
-
-    frame.columnconfigure(0, weight=1)
-    frame.columnconfigure(1, weight=1)
-    frame.columnconfigure(2, weight=1)
-
-    update_ui_texts()
-except Exception as e:
-    print(f"Error setting up UI components: {str(e)}")
-    with open("ui_error.txt", "w") as f:
-        f.write(f"Error setting up UI: {str(e)}\n")
-        traceback.print_exc(file=f)
-    messagebox.showerror("Error", f"Failed to initialize UI: {str(e)}")
-
-try:
-    root.mainloop()
-except Exception as e:
-    print(f"Error in main loop: {str(e)}")
-    with open("mainloop_error.txt", "w") as f:
-        f.write(f"Error in mainloop: {str(e)}\n")
-        traceback.print_exc(file=f)
\ No newline at end of file
+    try:
+        logo_path = resource_path(os.path.join("assets", "logosrtify1.png"))
+        if os.path.exists(logo_path):
+            logo_image = Image.open(logo_path).resize((180, 45), Image.LANCZOS)
+            logo_photo = ImageTk.PhotoImage(logo_image)
+            logo_label = tk.Label(frame, image=logo_photo, bg="#121212")
+            logo_label.image = logo_photo
+            logo_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
+        else:
+            print(f"Logo not found at: {logo_path}")
+    except Exception as e:
+        print(f"Error loading logo: {str(e)}")
+
+    try:
+        lang_ui_combobox = ttk.Combobox(frame, values=list(UI_LANGUAGES.keys()), state="readonly")
+        lang_ui_combobox.set("English")
+        lang_ui_combobox.grid(row=1, column=0, columnspan=3, sticky="e", pady=(0, 10))
+        lang_ui_combobox.bind("<<ComboboxSelected>>", change_language)
+
+        file_label = ttk.Label(frame)
+        file_label.grid(row=2, column=0, sticky="w")
+        file_entry = tk.Entry(frame, textvariable=selected_file, font=("Consolas", 10), bg="#1e1e1e", fg="white",
+                              relief="flat")
+        file_entry.grid(row=3, column=0, columnspan=2, sticky="ew", padx=(0, 10))
+        file_button = tk.Button(frame, text="...", command=browse_file, font=("Segoe UI", 10), bg="#7E57C2", fg="white",
+                                relief="flat")
+        file_button.grid(row=3, column=2, sticky="ew")
+
+        output_label = ttk.Label(frame)
+        output_label.grid(row=4, column=0, sticky="w", pady=(15, 5))
+        output_entry = tk.Entry(frame, textvariable=output_folder, font=("Consolas", 10), bg="#1e1e1e", fg="white",
+                                relief="flat")
+        output_entry.grid(row=5, column=0, columnspan=2, sticky="ew", padx=(0, 10))
+        output_button = tk.Button(frame, text="...", command=choose_output_folder, font=("Segoe UI", 10), bg="#7E57C2",
+                                  fg="white", relief="flat")
+        output_button.grid(row=5, column=2, sticky="ew")
+
+        lang_label = ttk.Label(frame)
+        lang_label.grid(row=6, column=0, columnspan=3, sticky="w", pady=(20, 5))
+        lang_combobox = ttk.Combobox(frame, values=list(LANGUAGES.keys()), state="readonly")
+        lang_combobox.set("English")
+        lang_combobox.grid(row=7, column=0, columnspan=3, sticky="ew")
+
+        model_label = ttk.Label(frame)
+        model_label.grid(row=8, column=0, columnspan=3, sticky="w", pady=(15, 5))
+        model_combobox = ttk.Combobox(frame, values=list(MODEL_OPTIONS.keys()), state="readonly")
+        model_combobox.set("base - fast, medium quality")
+        model_combobox.grid(row=9, column=0, columnspan=3, sticky="ew")
+        model_combobox.bind("<<ComboboxSelected>>", on_model_selected)
+
+        group_label = ttk.Label(frame)
+        group_label.grid(row=10, column=0, columnspan=2, sticky="w", pady=(15, 5))
+        group_spinbox = tk.Spinbox(frame, from_=1, to=10, textvariable=words_per_line, width=5)
+        group_spinbox.grid(row=10, column=2, sticky="ew")
+
+        limits_frame = ttk.Frame(frame)
+        limits_frame.grid(row=11, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        max_chars_label = ttk.Label(limits_frame, font=("Segoe UI", 10))
+        max_chars_label.pack(side="left")
+        tk.Spinbox(limits_frame, from_=0, to=200, textvariable=max_chars, width=4).pack(side="left", padx=(5, 15))
+        max_duration_label = ttk.Label(limits_frame, font=("Segoe UI", 10))
+        max_duration_label.pack(side="left")
+        tk.Spinbox(limits_frame, from_=0, to=30, increment=0.5, textvariable=max_duration, width=4).pack(
+            side="left", padx=(5, 15))
+        split_gap_label = ttk.Label(limits_frame, font=("Segoe UI", 10))
+        split_gap_label.pack(side="left")
+        tk.Spinbox(limits_frame, from_=0, to=5, increment=0.1, textvariable=split_gap, width=4).pack(
+            side="left", padx=(5, 0))
+
+        long_file_check = tk.Checkbutton(frame, variable=long_file_mode, font=("Segoe UI", 10), bg="#121212",
+                                         fg="#D1C4E9", selectcolor="#2c2c38", activebackground="#121212",
+                                         activeforeground="#D1C4E9", relief="flat")
+        long_file_check.grid(row=12, column=0, columnspan=3, sticky="w", pady=(10, 0))
+
+
+        def on_enter(e):
+            generate_button.config(bg="#6A1B9A")
+
+
+        def on_leave(e):
+            generate_button.config(bg="#7E57C2")
+
+
+        generate_button = tk.Button(
+            frame,
+            text=current_ui_lang["generate"],
+            command=run_transcription,
+            font=("Segoe UI", 12, "bold"),
+            bg="#7E57C2",
+            fg="white",
+            relief="flat"
+        )
+        generate_button.grid(row=13, column=0, columnspan=3, sticky="ew", pady=(20, 10))
+        generate_button.bind("<Enter>", on_enter)
+        generate_button.bind("<Leave>", on_leave)
+
+        progress = ttk.Progressbar(frame, mode='determinate', maximum=100)
+        progress.grid(row=14, column=0, columnspan=3, sticky='ew', pady=(0, 10))
+
+        queue_label = ttk.Label(frame)
+        queue_label.grid(row=15, column=0, columnspan=3, sticky="w", pady=(5, 5))
+        style.configure("Treeview", background="#1e1e1e", fieldbackground="#1e1e1e", foreground="white",
+                        font=("Segoe UI", 10))
+        queue_tree = ttk.Treeview(frame, columns=("file", "model", "status", "progress"), show="headings", height=6)
+        queue_tree.column("file", width=220)
+        queue_tree.column("model", width=70)
+        queue_tree.column("status", width=90)
+        queue_tree.column("progress", width=120)
+        queue_tree.grid(row=16, column=0, columnspan=3, sticky="ew")
+
+        cancel_button = tk.Button(frame, command=cancel_selected_jobs, font=("Segoe UI", 10), bg="#2c2c38",
+                                  fg="white", relief="flat")
+        cancel_button.grid(row=17, column=0, sticky="w", pady=(5, 0))
+        parallel_label = ttk.Label(frame)
+        parallel_label.grid(row=17, column=1, sticky="e", pady=(5, 0), padx=(0, 10))
+        parallel_spinbox = tk.Spinbox(frame, from_=1, to=8, textvariable=parallel_jobs, width=5,
+                                      command=on_parallel_jobs_changed)
+        parallel_spinbox.grid(row=17, column=2, sticky="ew", pady=(5, 0))
+        parallel_spinbox.bind("<FocusOut>", lambda e: on_parallel_jobs_changed())
+
+        latest_cues_label = ttk.Label(frame)
+        latest_cues_label.grid(row=18, column=0, columnspan=3, sticky="w", pady=(10, 5))
+        latest_cues_text = tk.Text(frame, height=6, font=("Consolas", 9), bg="#1e1e1e", fg="white", relief="flat",
+                                   wrap="word", state="disabled")
+        latest_cues_text.grid(row=19, column=0, columnspan=3, sticky="ew")
+
+        dc_icon_path = resource_path(os.path.join("assets", "dcblackicon.png"))
+        if os.path.exists(dc_icon_path):
+            def open_discord():
+                webbrowser.open("https://discord.com/users/eskimek")
+
+
+            try:
+                dc_img = Image.open(dc_icon_path).resize((24, 24), Image.LANCZOS)
+                dc_photo = ImageTk.PhotoImage(dc_img)
+                dc_btn = tk.Button(frame, image=dc_photo, text=" discord: eskimek", compound="left", command=open_discord,
+                                   font=("Segoe UI", 10), bg="#121212", fg="white", activebackground="#1e1e1e",
+                                   bd=0, relief="flat", cursor="hand2")
+                dc_btn.image = dc_photo
+                dc_btn.grid(row=20, column=0, columnspan=3, pady=(10, 0))
+            except Exception as e:
+                print(f"Error loading Discord icon: {str(e)}")
+                dc_btn = tk.Button(frame, text="discord: eskimek", command=open_discord,
+                                   font=("Segoe UI", 10), bg="#121212", fg="white",
+                                   bd=0, relief="flat", cursor="hand2")
+                dc_btn.grid(row=20, column=0, columnspan=3, pady=(10, 0))
+
+        frame.columnconfigure(0, weight=1)
+        frame.columnconfigure(1, weight=1)
+        frame.columnconfigure(2, weight=1)
+
+        update_ui_texts()
+    except Exception as e:
+        print(f"Error setting up UI components: {str(e)}")
+        with open("ui_error.txt", "w") as f:
+            f.write(f"Error setting up UI: {str(e)}\n")
+            traceback.print_exc(file=f)
+        messagebox.showerror("Error", f"Failed to initialize UI: {str(e)}")
+
+    # The first idle callback runs once the window has been drawn
+    root.after_idle(lambda: root.after(0, lambda: on_window_shown(exit_after_startup)))
+
+    try:
+        root.mainloop()
+    except Exception as e:
+        print(f"Error in main loop: {str(e)}")
+        with open("mainloop_error.txt", "w") as f:
+            f.write(f"Error in mainloop: {str(e)}\n")
+            traceback.print_exc(file=f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate word-level .srt subtitles. Without input files the GUI is started.")
+    parser.add_argument("inputs", nargs="*", help="media files, folders or glob patterns to transcribe headless")
+    parser.add_argument("-m", "--model", default="base", choices=list(MODEL_OPTIONS.values()),
+                        help="transcription model (default: base)")
+    parser.add_argument("-l", "--language", default="auto",
+                        choices=["auto"] + [code for code in LANGUAGES.values() if code],
+                        help="spoken language code, or auto to detect it (default: auto)")
+    parser.add_argument("-w", "--words-per-line", type=int, default=1, help="words per subtitle line (default: 1)")
+    parser.add_argument("--max-chars", type=int, help="start a new subtitle line before it gets longer than this")
+    parser.add_argument("--max-duration", type=float, help="longest time in seconds one subtitle line stays on screen")
+    parser.add_argument("--split-gap", type=float,
+                        help="start a new subtitle line at pauses of at least this many seconds")
+    parser.add_argument("-o", "--output-dir", help="folder for the .srt files (default: next to each input)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes, each keeps its own model loaded (default: 1)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="also search subfolders of input folders")
+    parser.add_argument("--skip-existing", action="store_true", help="skip files whose .srt already exists")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always transcribe again instead of reusing cached words for the same file/model/language")
+    parser.add_argument("--long-file", action="store_true",
+                        help="split each file at silences and transcribe the chunks in parallel on --workers")
+    parser.add_argument("--chunk-minutes", type=float, default=LONG_FILE_CHUNK_SECONDS / 60,
+                        help="target chunk length for --long-file (default: %(default)s)")
+    parser.add_argument("--clip-batch", type=int, default=0, metavar="N",
+                        help=f"transcribe inputs of up to {CLIP_MAX_SECONDS} seconds N at a time in one batched "
+                             f"model pass, for large numbers of short clips (default: off; {CLIP_BATCH_SIZE} "
+                             f"in the benchmark)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep watching the input folders and transcribe new media files once they stop growing")
+    parser.add_argument("--settle-seconds", type=float, default=WATCH_SETTLE_SECONDS,
+                        help="how long a watched file must stay unchanged before it is transcribed (default: %(default)s)")
+    parser.add_argument("--poll-seconds", type=float, default=WATCH_POLL_SECONDS,
+                        help="how often watched files are checked again (default: %(default)s)")
+    parser.add_argument("--poll", action="store_true",
+                        help="watch by rescanning instead of inotify, e.g. for network shares")
+    parser.add_argument("--watch-state", metavar="FILE",
+                        help="where the watch mode remembers processed files (default: in the cache folder)")
+    parser.add_argument("--stream-decode", action="store_true",
+                        help="always read audio from ffmpeg window by window instead of decoding it up front; "
+                             "by default only inputs of SRTING_STREAM_DECODE_HOURS (2) or more are streamed")
+    parser.add_argument("--vad", action="store_true",
+                        help="only send speech to the model, skipping silence, music and noise (also SRTING_VAD=1)")
+    parser.add_argument("--vad-margin-db", type=float, default=VAD_MARGIN_DB,
+                        help="how far above the noise floor a frame must be to count as speech (default: %(default)s)")
+    parser.add_argument("--vad-zcr", type=float, default=VAD_ZCR_THRESHOLD,
+                        help="zero-crossing rate from which quieter frames count as speech too (default: %(default)s)")
+    parser.add_argument("--vad-padding", type=float, default=VAD_PADDING_SECONDS,
+                        help="seconds kept before and after every speech region (default: %(default)s)")
+    parser.add_argument("--no-language-prepass", action="store_true",
+                        help="with -l auto, let the chosen model detect the language by itself instead of checking a "
+                             "few samples with the tiny model first (also SRTING_LANGUAGE_PREPASS=0)")
+    parser.add_argument("--server", metavar="URL",
+                        help="send the files to a running SRTing server instead of transcribing locally")
+    parser.add_argument("--serve", action="store_true", help="run the local HTTP transcription service")
+    parser.add_argument("--host", default="127.0.0.1", help="address to serve on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to serve on (default: 8765)")
+    parser.add_argument("--server-jobs", type=int, default=1, help="jobs the server runs at once (default: 1)")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="pending jobs the server accepts before answering 503 (default: 32)")
+    parser.add_argument("--max-upload-mb", type=int, default=4096, help="largest accepted upload (default: 4096)")
+    parser.add_argument("--allow-remote-paths", action="store_true",
+                        help="accept JSON jobs with a server-side path from other machines, not only from this one")
+    parser.add_argument("--preload", type=lambda value: [item for item in value.split(",") if item], default=[],
+                        help="comma separated models the server loads at startup, e.g. base,small")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure decode, model load, real-time factor, SRT writing, cold start and peak memory")
+    parser.add_argument("--bench-models", type=lambda value: [item for item in value.split(",") if item],
+                        default=["tiny", "base"], help="comma separated models to benchmark (default: tiny,base)")
+    parser.add_argument("--bench-seconds", type=float, default=60,
+                        help="length of the synthetic test audio (default: 60)")
+    parser.add_argument("--bench-audio", metavar="FILE",
+                        help="benchmark on this recording instead of synthetic audio; needed for a meaningful "
+                             "word error rate of the int8 models")
+    parser.add_argument("--bench-clips", type=int, default=0,
+                        help="also compare clips per minute of short synthetic clips transcribed one by one and "
+                             "batched, see --clip-batch (default: 0, off)")
+    parser.add_argument("--bench-clip-seconds", type=float, default=15,
+                        help="length of every benchmark clip (default: %(default)s)")
+    parser.add_argument("--bench-words", type=int, default=100000,
+                        help="words in the SRT writing benchmark (default: 100000)")
+    parser.add_argument("--stub-model", action="store_true", help="benchmark without model weights")
+    parser.add_argument("--skip-cold-start", action="store_true", help="don't launch the GUI to time the cold start")
+    parser.add_argument("--bench-output", default="benchmark_results.json",
+                        help="where to write the results (default: benchmark_results.json)")
+    parser.add_argument("--bench-compare", metavar="RESULTS_JSON",
+                        help="compare with an earlier results file and exit with 1 on regressions")
+    parser.add_argument("--bench-tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help="relative slowdown counted as a regression (default: %(default)s)")
+    parser.add_argument("--intra-op-threads", type=int, default=TORCH_INTRA_OP_THREADS,
+                        help="threads torch uses inside one operation, 0 for torch's default "
+                             "(also SRTING_INTRA_OP_THREADS)")
+    parser.add_argument("--inter-op-threads", type=int, default=TORCH_INTER_OP_THREADS,
+                        help="threads torch runs independent operations on, 0 for torch's default "
+                             "(also SRTING_INTER_OP_THREADS)")
+    parser.add_argument("--convert-models", nargs="?", const="all", metavar="MODELS",
+                        help="convert comma separated models, or all of them, to the fast loading format and exit; "
+                             "otherwise every model is converted on its first load (off with SRTING_FAST_MODELS=0)")
+    parser.add_argument("--startup-check", action="store_true",
+                        help="open the GUI, report the cold start time and exit with 1 if it is over budget")
+    args = parser.parse_args(argv)
+    args.words_per_line = max(1, args.words_per_line)
+    if args.watch and not args.inputs:
+        parser.error("--watch needs at least one folder to watch")
+    for model_type in args.preload + args.bench_models:
+        if model_type not in MODEL_OPTIONS.values():
+            parser.error(f"unknown model: {model_type}")
+    if args.convert_models:
+        # int8 models are quantized from the converted full precision model while loading
+        names = [model_type[:-len(QUANTIZED_SUFFIX)] if model_type.endswith(QUANTIZED_SUFFIX) else model_type
+                 for model_type in (MODEL_OPTIONS.values() if args.convert_models == "all"
+                                    else args.convert_models.split(","))]
+        for model_type in names:
+            if model_type not in MODEL_OPTIONS.values():
+                parser.error(f"unknown model: {model_type}")
+        args.convert_models = list(dict.fromkeys(names))
+    return args
+
+
+def main(argv=None):
+    global TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS, STREAM_DECODE_MIN_HOURS
+    global VAD_ENABLED, VAD_MARGIN_DB, VAD_ZCR_THRESHOLD, VAD_PADDING_SECONDS, LANGUAGE_PREPASS_ENABLED
+    multiprocessing.freeze_support()
+    args = parse_args(argv)
+    if args.stream_decode:
+        STREAM_DECODE_MIN_HOURS = 0
+        os.environ["SRTING_STREAM_DECODE_HOURS"] = "0"
+    if args.no_language_prepass:
+        LANGUAGE_PREPASS_ENABLED = False
+        os.environ["SRTING_LANGUAGE_PREPASS"] = "0"
+    if args.vad:
+        VAD_ENABLED = True
+        os.environ["SRTING_VAD"] = "1"
+    VAD_MARGIN_DB, VAD_ZCR_THRESHOLD, VAD_PADDING_SECONDS = args.vad_margin_db, args.vad_zcr, args.vad_padding
+    os.environ["SRTING_VAD_MARGIN_DB"] = str(VAD_MARGIN_DB)
+    os.environ["SRTING_VAD_ZCR"] = str(VAD_ZCR_THRESHOLD)
+    os.environ["SRTING_VAD_PADDING"] = str(VAD_PADDING_SECONDS)
+    # Through the environment the thread settings also reach spawned worker processes
+    TORCH_INTRA_OP_THREADS = max(0, args.intra_op_threads)
+    TORCH_INTER_OP_THREADS = max(0, args.inter_op_threads)
+    os.environ["SRTING_INTRA_OP_THREADS"] = str(TORCH_INTRA_OP_THREADS)
+    os.environ["SRTING_INTER_OP_THREADS"] = str(TORCH_INTER_OP_THREADS)
+    if args.convert_models:
+        sys.exit(run_convert_models(args))
+    if args.serve:
+        sys.exit(run_server(args))
+    if args.benchmark:
+        sys.exit(run_benchmark(args))
+    if args.watch:
+        sys.exit(run_watch(args))
+    if args.inputs:
+        sys.exit(run_batch(args))
+    run_gui(exit_after_startup=args.startup_check)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import importlib.util
+import os
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SRTing-python-opensrc.py")
+
+
+@pytest.fixture(scope="session")
+def srting():
+    """The application script loaded as a module (its file name isn't importable)"""
+    spec = importlib.util.spec_from_file_location("srting", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setenv("SRTING_CACHE_DIR", str(path))
+    return path
+
+
+def make_words(count, seed=0):
+    """Words of varying length and duration with pauses of varying length between them; times are multiples of
+    1/8 s so sums and comparisons are exact"""
+    import random
+
+    rng = random.Random(seed)
+    words = []
+    time = 0.0
+    for index in range(count):
+        start = time + rng.choice([0, 0, 0, 1, 2, 8]) / 8
+        end = start + rng.randint(1, 6) / 8
+        words.append({"text": "w" * rng.randint(1, 9) + str(index), "start": start, "end": end})
+        time = end
+    return words
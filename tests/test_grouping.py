@@ -0,0 +1,88 @@
+import pytest
+
+from conftest import make_words
+
+
+def naive_bounds(words, rules):
+    """Cue starts found word by word, the way the rules read"""
+    bounds = [0]
+    for index in range(1, len(words)):
+        cue = words[bounds[-1]:index + 1]
+        text = " ".join(word["text"] for word in cue)
+        if ((rules.max_words and len(cue) > rules.max_words)
+                or (rules.max_chars is not None and len(text) > rules.max_chars)
+                or (rules.max_duration is not None
+                    and max(word["end"] for word in cue) - cue[0]["start"] > rules.max_duration)
+                or (rules.split_gap is not None
+                    and words[index]["start"] - words[index - 1]["end"] >= rules.split_gap)):
+            bounds.append(index)
+    return bounds + [len(words)]
+
+
+@pytest.mark.parametrize("max_words, max_chars, max_duration, split_gap", [
+    (1, None, None, None),
+    (3, None, None, None),
+    (7, None, None, None),
+    (0, 20, None, None),
+    (0, None, 1.5, None),
+    (0, None, None, 0.5),
+    (4, 18, 2.0, 0.25),
+    (10, 5, None, None),
+    (2, None, 0.125, 1.0),
+])
+def test_group_bounds_matches_naive_grouping(srting, max_words, max_chars, max_duration, split_gap):
+    words = make_words(500)
+    rules = srting.GroupingRules(max_words, max_chars, max_duration, split_gap)
+    bounds = srting.group_bounds(srting.WordTable.from_words(words), rules)
+    assert bounds.tolist() == naive_bounds(words, rules)
+
+
+def test_plain_words_per_line_matches_slicing(srting):
+    words = make_words(23)
+    table = srting.WordTable.from_words(words)
+    for group_size in range(1, 8):
+        bounds = srting.group_bounds(table, group_size).tolist()
+        assert bounds == list(range(0, len(words), group_size)) + [len(words)]
+
+
+def test_group_bounds_without_words(srting):
+    table = srting.WordTable.from_words([])
+    assert srting.group_bounds(table, 3).tolist() == [0]
+    assert srting.group_bounds(table, srting.GroupingRules(3, max_chars=10)).tolist() == [0]
+    assert srting.srt_cues(table, srting.group_bounds(table, 3)) == []
+
+
+def test_a_word_longer_than_max_chars_gets_its_own_cue(srting):
+    words = [{"text": "a", "start": 0.0, "end": 0.5}, {"text": "extraordinarily", "start": 0.5, "end": 1.0},
+             {"text": "b", "start": 1.0, "end": 1.5}]
+    table = srting.WordTable.from_words(words)
+    assert srting.group_bounds(table, srting.GroupingRules(5, max_chars=4)).tolist() == [0, 1, 2, 3]
+
+
+def test_grouping_rules_of(srting):
+    assert srting.GroupingRules.of(3).max_words == 3
+    assert srting.GroupingRules.of(0).max_words == 1
+    rules = srting.GroupingRules(2, max_chars=40)
+    assert srting.GroupingRules.of(rules) is rules
+    assert rules.as_dict() == {"words_per_line": 2, "max_chars": 40, "max_duration": None, "split_gap": None}
+
+
+def test_srt_cues(srting):
+    words = [{"text": " Hello", "start": 0.0, "end": 0.5}, {"text": "world", "start": 0.5, "end": 1.25},
+             {"text": "again", "start": 3661.5, "end": 3662.0}]
+    table = srting.WordTable.from_words(words)
+    cues = srting.srt_cues(table, srting.group_bounds(table, 2), first_index=7)
+    assert cues == [
+        "7\n00:00:00,000 --> 00:00:01,250\nHello world\n\n",
+        "8\n01:01:01,500 --> 01:01:02,000\nagain\n\n",
+    ]
+
+
+def test_word_table_round_trip(srting):
+    words = make_words(10)
+    words[3]["confidence"] = 0.5
+    table = srting.WordTable.from_words(words)
+    assert table.to_words() == words
+    halves = srting.WordTable.concat([table.slice(0, 4), table.slice(4, 10)])
+    assert halves.to_words() == words
+    assert halves.text == table.text
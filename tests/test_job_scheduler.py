@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Runner:
+    """run_job that records the order jobs start in and holds each one until it is released or cancelled"""
+
+    def __init__(self, srting):
+        self.srting = srting
+        self.started = []
+        self.release = threading.Event()
+
+    def __call__(self, job):
+        self.started.append(job.id)
+        while not self.release.wait(0.01):
+            self.srting.check_cancelled(job.cancel_event)
+        if job.model_type == "broken":
+            raise RuntimeError("model is broken")
+
+
+@pytest.fixture
+def registry(srting, monkeypatch):
+    """A registry with only "base" loaded, which the scheduler prefers"""
+    registry = srting.ModelRegistry(1024 * 1024 * 1024, srting.StubBackend())
+    registry.get("base")
+    monkeypatch.setattr(srting, "model_registry", registry)
+    return registry
+
+
+def make_job(srting, model_type="base"):
+    return srting.TranscriptionJob("clip.wav", None, "en", model_type, 1)
+
+
+def test_cancelling_a_pending_job_never_runs_it(srting, registry):
+    runner = Runner(srting)
+    scheduler = srting.JobScheduler(runner)
+    first = scheduler.submit(make_job(srting))
+    second = scheduler.submit(make_job(srting))
+    wait_for(lambda: runner.started == [first.id])
+
+    assert scheduler.cancel(second.id)
+    assert second.status == "cancelled" and second.finished_at is not None
+    runner.release.set()
+    wait_for(scheduler.idle)
+    assert runner.started == [first.id]
+    assert first.status == "done"
+    assert not scheduler.cancel(second.id)
+
+
+def test_cancelling_a_running_job_stops_it(srting, registry):
+    runner = Runner(srting)
+    scheduler = srting.JobScheduler(runner)
+    job = scheduler.submit(make_job(srting))
+    wait_for(lambda: runner.started)
+
+    assert scheduler.cancel(job.id)
+    wait_for(lambda: job.finished)
+    assert job.status == "cancelled" and job.error is None
+
+
+def test_failed_jobs_report_the_error_and_the_queue_goes_on(srting, registry):
+    runner = Runner(srting)
+    runner.release.set()
+    scheduler = srting.JobScheduler(runner)
+    broken = scheduler.submit(make_job(srting, "broken"))
+    after = scheduler.submit(make_job(srting))
+    wait_for(scheduler.idle)
+    assert broken.status == "failed" and broken.error == "model is broken"
+    assert after.status == "done"
+
+
+def test_submit_refuses_jobs_beyond_max_pending(srting, registry):
+    runner = Runner(srting)
+    scheduler = srting.JobScheduler(runner, max_pending=2)
+    scheduler.submit(make_job(srting))
+    wait_for(lambda: runner.started)
+    scheduler.submit(make_job(srting))
+    scheduler.submit(make_job(srting))
+    with pytest.raises(srting.QueueFull):
+        scheduler.submit(make_job(srting))
+    assert scheduler.count("pending") == 2
+    runner.release.set()
+    wait_for(scheduler.idle)
+
+
+def test_jobs_with_a_loaded_model_start_first(srting, registry):
+    runner = Runner(srting)
+    scheduler = srting.JobScheduler(runner)
+    blocker = scheduler.submit(make_job(srting, "tiny"))
+    wait_for(lambda: runner.started)
+    cold = scheduler.submit(make_job(srting, "small"))
+    warm = scheduler.submit(make_job(srting, "base"))
+    assert scheduler.position(warm) == 2 and scheduler.position(cold) == 1
+
+    runner.release.set()
+    wait_for(scheduler.idle)
+    assert runner.started == [blocker.id, warm.id, cold.id]
+
+
+def test_jobs_avoid_a_model_that_is_already_busy(srting, registry):
+    runner = Runner(srting)
+    scheduler = srting.JobScheduler(runner)
+    busy = scheduler.submit(make_job(srting, "base"))
+    wait_for(lambda: runner.started)
+    same_model = scheduler.submit(make_job(srting, "base"))
+    other_model = scheduler.submit(make_job(srting, "small"))
+
+    # A second slot goes to the job that doesn't have to wait for the busy model
+    scheduler.set_max_concurrent(2)
+    wait_for(lambda: len(runner.started) == 2)
+    assert runner.started == [busy.id, other_model.id]
+    runner.release.set()
+    wait_for(scheduler.idle)
+    assert same_model.status == "done"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(b"not really audio, only hashed")
+    return str(path)
+
+
+def test_journal_is_read_back_after_a_restart(srting, cache_dir, media_file):
+    journal = srting.TranscriptionJournal(media_file, "base", "en")
+    journal.append(0, 100, "en", [{"text": "one", "start": 0.0, "end": 0.5, "confidence": 0.9, "extra": 1}])
+    journal.append(100, 200, "en", [])
+
+    resumed = srting.TranscriptionJournal(media_file, "base", "en")
+    assert resumed.path == journal.path
+    assert resumed.get(0, 100)["words"] == [{"text": "one", "start": 0.0, "end": 0.5, "confidence": 0.9}]
+    assert resumed.get(100, 200)["words"] == []
+    assert resumed.get(200, 300) is None
+    assert srting.TranscriptionJournal(media_file, "small", "en").get(0, 100) is None
+
+    resumed.remove()
+    assert srting.TranscriptionJournal(media_file, "base", "en").get(0, 100) is None
+
+
+def test_journal_drops_a_line_cut_off_mid_write(srting, cache_dir, media_file):
+    journal = srting.TranscriptionJournal(media_file, "base", None)
+    journal.append(0, 100, "pl", [{"text": "raz", "start": 0.0, "end": 0.5}])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"start": 100, "end": 200, "lang')
+
+    resumed = srting.TranscriptionJournal(media_file, "base", None)
+    assert list(resumed.windows) == [(0, 100)]
+    resumed.append(100, 200, "pl", [])
+    assert list(srting.TranscriptionJournal(media_file, "base", None).windows) == [(0, 100), (100, 200)]
+
+
+class CountingModel:
+    def __init__(self, srting):
+        self.model = srting.StubModel("tiny")
+        self.calls = 0
+
+    def transcribe(self, audio, language=None):
+        self.calls += 1
+        return self.model.transcribe(audio, language)
+
+
+def test_transcribe_windows_resumes_from_the_journal(srting, cache_dir, media_file, monkeypatch):
+    monkeypatch.setattr(srting, "VAD_ENABLED", False)
+    monkeypatch.setattr(srting.model_registry, "backend", srting.StubBackend())
+    audio = np.full(50 * SAMPLE_RATE, 0.1, dtype=np.float32)
+
+    model = CountingModel(srting)
+    full = srting.transcribe_windows(model, audio, "en", window_seconds=10)
+    windows = model.calls
+    assert windows > 1
+
+    # An interrupted run: the first two windows made it into the journal
+    journal = srting.TranscriptionJournal(media_file, "tiny", "en")
+    model = CountingModel(srting)
+    cancel_event = srting.threading.Event()
+
+    def cancel_after_two(words, processed_seconds, total_seconds):
+        if model.calls == 2:
+            cancel_event.set()
+
+    with pytest.raises(srting.JobCancelled):
+        srting.transcribe_windows(model, audio, "en", on_words=cancel_after_two, cancel_event=cancel_event,
+                                  window_seconds=10, journal=journal)
+
+    model = CountingModel(srting)
+    resumed = srting.transcribe_windows(model, audio, "en", window_seconds=10,
+                                        journal=srting.TranscriptionJournal(media_file, "tiny", "en"))
+    assert model.calls == windows - 2
+    assert resumed == full
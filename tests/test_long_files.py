@@ -0,0 +1,45 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def word(text, start, end):
+    return {"text": text, "start": start, "end": end}
+
+
+def test_stitch_words_drops_repeats_and_overlaps_at_the_seam(srting):
+    previous = word(" fox", 9.5, 10.0)
+    words = [word(" Fox", 9.6, 9.9), word(" jumps", 9.8, 10.4), word(" over", 9.9, 10.0), word(" the", 10.5, 10.7),
+             word(" dog", 10.6, 10.9)]
+    assert srting.stitch_words(previous, words) == [word(" jumps", 10.0, 10.4), word(" the", 10.5, 10.7),
+                                                    word(" dog", 10.6, 10.9)]
+
+
+def test_stitch_words_keeps_everything_without_a_previous_word(srting):
+    words = [word("a", 0.0, 0.5), word("a", 0.2, 0.6)]
+    assert srting.stitch_words(None, words) == words
+    assert srting.stitch_words(word("x", 0.0, 0.1), []) == []
+
+
+def noise_with_pauses(seconds, pauses):
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, seconds * SAMPLE_RATE).astype(np.float32)
+    for pause in pauses:
+        audio[int((pause - 0.5) * SAMPLE_RATE):int((pause + 0.5) * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_split_at_silence_cuts_in_the_pauses(srting):
+    audio = noise_with_pauses(110, [27, 58, 91])
+    spans = srting.split_at_silence(audio, 30, search_seconds=5)
+    assert spans[0][0] == 0 and spans[-1][1] == len(audio)
+    assert all(end == start for (_, end), (start, _) in zip(spans, spans[1:]))
+    cuts = [start / SAMPLE_RATE for start, _ in spans[1:]]
+    assert len(cuts) == 3
+    for cut, pause in zip(cuts, [27, 58, 91]):
+        assert abs(cut - pause) < 0.5
+
+
+def test_split_at_silence_keeps_short_audio_whole(srting):
+    audio = np.zeros(40 * SAMPLE_RATE, dtype=np.float32)
+    assert srting.split_at_silence(audio, 30) == [(0, len(audio))]
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def backend(srting):
+    class CountingBackend(srting.StubBackend):
+        """StubModels of 100 MB each that take a moment to load and count their loads"""
+
+        def __init__(self):
+            self.loads = []
+            self.fail = set()
+
+        def load(self, model_type):
+            self.loads.append(model_type)
+            time.sleep(0.05)
+            if model_type in self.fail:
+                raise RuntimeError(f"Cannot load {model_type}")
+            return super().load(model_type)
+
+        def model_size(self, model):
+            return 100 * MB
+
+    return CountingBackend()
+
+
+def test_concurrent_gets_load_a_model_once(srting, backend):
+    registry = srting.ModelRegistry(1000 * MB, backend)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.get("base"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.loads == ["base"]
+    assert len(models) == 8 and all(model is models[0] for model in models)
+
+
+def test_least_recently_used_model_is_evicted(srting, backend):
+    registry = srting.ModelRegistry(250 * MB, backend)
+    registry.get("tiny")
+    registry.get("base")
+    registry.get("tiny")
+    registry.get("small")
+    assert registry.loaded_models() == ["tiny", "small"]
+    registry.get("base")
+    assert backend.loads == ["tiny", "base", "small", "base"]
+
+
+def test_models_in_use_are_never_evicted(srting, backend):
+    registry = srting.ModelRegistry(150 * MB, backend)
+    with registry.use("tiny") as model:
+        registry.get("base")
+        registry.get("small")
+        assert "tiny" in registry.loaded_models()
+        assert registry.get("tiny") is model
+        registry.clear()
+        assert registry.loaded_models() == ["tiny"]
+    # Over budget only while it was borrowed
+    registry.get("base")
+    assert registry.loaded_models() == ["base"]
+
+
+def test_a_failed_load_can_be_retried(srting, backend):
+    registry = srting.ModelRegistry(1000 * MB, backend)
+    backend.fail.add("base")
+    with pytest.raises(RuntimeError):
+        registry.get("base")
+    assert not registry.is_loaded("base")
+    backend.fail.clear()
+    assert registry.get("base").model_type == "base"
+    assert backend.loads == ["base", "base"]
+
+
+def test_preload_loads_in_the_background(srting, backend):
+    registry = srting.ModelRegistry(1000 * MB, backend)
+    registry.preload("small")
+    registry.preload("small")
+    registry.get("small")
+    assert backend.loads == ["small"]
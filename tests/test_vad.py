@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+SAMPLE_RATE = 16000
+
+
+def word(text, start, end):
+    return {"text": text, "start": start, "end": end}
+
+
+def test_speech_map_moves_words_back_onto_the_original_timeline(srting):
+    # Speech at 1-2 s and 3-4 s of the span, joined into 2 s of audio
+    speech = srting.SpeechMap([(1 * SAMPLE_RATE, 2 * SAMPLE_RATE), (3 * SAMPLE_RATE, 4 * SAMPLE_RATE)])
+    audio = np.arange(5 * SAMPLE_RATE, dtype=np.float32)
+    compact = speech.compact(audio)
+    assert len(compact) == 2 * SAMPLE_RATE
+    assert compact[SAMPLE_RATE] == 3 * SAMPLE_RATE
+
+    mapped = speech.map_words([word("a", 0.25, 0.5), word("b", 1.25, 1.5), word("c", 0.75, 1.25)], 10.0, 13.5)
+    assert [(item["text"], item["start"], item["end"]) for item in mapped] == [
+        ("a", 11.25, 11.5),
+        ("b", 13.25, 13.5),
+        # Running over the join the word ends with its region instead of spanning the cut out silence
+        ("c", 11.75, 12.0),
+    ]
+
+
+def test_speech_map_clips_at_the_limit(srting):
+    speech = srting.SpeechMap([(0, SAMPLE_RATE), (2 * SAMPLE_RATE, 3 * SAMPLE_RATE)])
+    mapped = speech.map_words([word("a", 1.25, 1.75), word("b", 0.5, 0.75)], 0.0, 2.5)
+    assert [(item["text"], item["start"], item["end"]) for item in mapped] == [("a", 2.25, 2.5), ("b", 0.5, 0.75)]
+    assert speech.map_words([], 0.0, 1.0) == []
+
+
+@pytest.mark.parametrize("vad", [False, True])
+def test_transcribe_span_offsets_words(srting, monkeypatch, vad):
+    monkeypatch.setattr(srting, "VAD_ENABLED", vad)
+    monkeypatch.setattr(srting.model_registry, "backend", srting.StubBackend())
+    monkeypatch.setattr(srting, "detect_speech", lambda audio: [(0, len(audio))])
+    audio = np.ones(2 * SAMPLE_RATE, dtype=np.float32)
+    words, lang = srting.transcribe_span(srting.StubModel("tiny"), audio, "en", offset=5.0)
+    assert lang == "en"
+    assert words and words[0]["start"] == pytest.approx(5.0)
+    assert all(5.0 <= item["start"] < item["end"] <= 7.0 for item in words)